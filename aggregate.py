@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import metrics
+import rollups
+from bucketing import add_timestamps, split_intervals, focus_by_bin
+from partitions import partition_paths
+from session_schema import frame_from_rows, iter_sessions, report_bad
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# The dashboard renders a summary: KPIs, minutes per category and focus per time bin.
+# It can come from raw session rows or from the precomputed rollups.
+@metrics.timed("aggregate.summarize")
+def summarize_frame(df, bin_minutes=60):
+    return {
+        "total_mins": float(df['Actual_Mins'].astype(float).sum()),
+        "avg_focus": df['Focus_Level'].mean(),
+        "categories": df.groupby('Category', observed=True)['Actual_Mins'].sum(),
+        "bins": focus_by_bin(df, bin_minutes),
+    }
+
+@metrics.timed("aggregate.rollups")
+def summarize_rollups(store, first_day, last_day):
+    # Reads O(days + hours) rollup rows, however many sessions the range holds
+    first, last = first_day.strftime("%Y-%m-%d"), last_day.strftime("%Y-%m-%d")
+    days = store.query_rollups("day", first, last, category=None)
+    overall = [r for r in days if r["category"] == rollups.ALL]
+    if not overall:
+        return None
+    totals = {f: sum(r[f] for r in overall) for f in rollups.FIELDS}
+    categories = pd.Series([r["minutes"] for r in days if r["category"] != rollups.ALL],
+                           index=[r["category"] for r in days if r["category"] != rollups.ALL], dtype=float)
+
+    hours = store.query_rollups("hour", f"{first} 00", f"{last} 23")
+    index = pd.to_datetime([r["period"] for r in hours], format="%Y-%m-%d %H")
+    bins = pd.DataFrame({"Active_Mins": [r["minutes"] for r in hours],
+                         "Focus": [rollups.weighted_focus(r) for r in hours]}, index=index)
+    if len(bins):
+        # Keep empty hours between the first and last active hour, like focus_by_bin
+        bins = bins.reindex(pd.date_range(bins.index.min(), bins.index.max(), freq="h"))
+        bins["Active_Mins"] = bins["Active_Mins"].fillna(0.0)
+    return {
+        "total_mins": totals["minutes"],
+        "avg_focus": rollups.focus_avg(totals),
+        "categories": categories.groupby(level=0).sum(),
+        "bins": bins,
+    }
+
+class RangeAggregator:
+    # Folds chunks of sessions into running totals. Memory depends on the number
+    # of categories and the fixed 7x24 heatmap, never on how many rows stream through.
+
+    def __init__(self, start=None, end=None):
+        # Optional [start, end) filter on session end time, for sources that can't filter themselves
+        self.start, self.end = start, end
+        self.sessions = 0
+        self.total_mins = 0.0
+        self.focus_sum = 0.0
+        self.rated_count = 0
+        self.categories = {}
+        # [weekday, hour] -> active minutes, focus-weighted minutes, rated minutes
+        self.heat = np.zeros((7, 24, 3))
+
+    @metrics.timed("aggregate.add")
+    def add(self, chunk):
+        df = add_timestamps(chunk.copy())
+        if self.start is not None:
+            df = df[(df['End_TS'] >= self.start) & (df['End_TS'] < self.end)]
+        if df.empty:
+            return
+
+        focus = df['Focus_Level'].to_numpy(dtype=float, na_value=np.nan)
+        rated = ~np.isnan(focus)
+        self.sessions += len(df)
+        self.total_mins += float(df['Actual_Mins'].sum())
+        self.focus_sum += float(focus[rated].sum())
+        self.rated_count += int(rated.sum())
+        for cat, mins in df.groupby('Category', observed=True)['Actual_Mins'].sum().items():
+            self.categories[cat] = self.categories.get(cat, 0.0) + mins
+
+        # Same overlap split as the hourly charts, over absolute hours of this
+        # chunk, then folded onto weekday x hour-of-day
+        origin = df['Start_TS'].min().floor('h')
+        to_mins = lambda ts: ((ts - origin) / pd.Timedelta(minutes=1)).to_numpy(dtype=float)
+        starts, ends = to_mins(df['Start_TS']), to_mins(df['End_TS'])
+        n_bins = int(np.ceil(ends.max() / 60))
+        weights = np.column_stack([np.ones(len(df)), np.where(rated, focus, 0.0), rated])
+        sums = split_intervals(starts, ends, weights, n_bins, 60)
+        hours = origin + pd.to_timedelta(np.arange(n_bins), unit='h')
+        np.add.at(self.heat, (hours.weekday, hours.hour), sums)
+
+    @metrics.timed("aggregate.summary")
+    def summary(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            heat_focus = np.where(self.heat[:, :, 2] > 0, self.heat[:, :, 1] / self.heat[:, :, 2], np.nan)
+        return {
+            "total_mins": self.total_mins,
+            "avg_focus": self.focus_sum / self.rated_count if self.rated_count else float("nan"),
+            "categories": pd.Series(self.categories, dtype=float).sort_index(),
+            "heat_minutes": self.heat[:, :, 0].copy(),
+            "heat_focus": heat_focus,
+        }
+
+def aggregate_store(store, start, end, chunk_size=5000):
+    # Streams the store's date-indexed range scan chunk by chunk
+    agg = RangeAggregator()
+    for rows in store.iter_range(start, end, chunk_size):
+        with metrics.span("aggregate.frame"):
+            df, bad = frame_from_rows(rows)
+        report_bad(bad, "session store")
+        agg.add(df)
+    return agg
+
+def aggregate_csv(path, start, end, chunksize=50000, report=report_bad, agg=None):
+    # Same aggregation straight from a session CSV, read in bounded chunks
+    agg = agg or RangeAggregator(pd.Timestamp(start), pd.Timestamp(end))
+    for df, bad in iter_sessions(path, chunksize):
+        if report:
+            report(bad, path)
+        agg.add(df)
+    return agg
+
+def aggregate_log(start, end, chunksize=50000, report=report_bad):
+    # The partitioned log: only the months that overlap [start, end) are read
+    agg = RangeAggregator(pd.Timestamp(start), pd.Timestamp(end))
+    for path in partition_paths(start, end):
+        aggregate_csv(path, start, end, chunksize, report, agg)
+    return agg
@@ -1,11 +1,147 @@
-import pygame
+import threading
+import time
+import metrics
 
-def play_alarm():
-    pygame.mixer.init()
-    # Loading the aiff file you renamed/copied earlier
-    pygame.mixer.music.load("alarm.aiff")
-    # -1 means play on an infinite loop
-    pygame.mixer.music.play(-1) 
+# Sounds decoded into memory by preload(); more can be added with add_sound()
+DEFAULT_SOUNDS = {"alarm": "alarm.aiff"}
+# Longest a caller that asks to wait (see play()) waits for a preload still running
+LOAD_TIMEOUT = 2.0
+RAMP_STEP = 0.05
+
+class AudioService:
+    # Initializes the mixer once, on a background thread, and keeps every sound
+    # decoded in memory so playing one is just handing a buffer to a channel.
+    # pygame is imported on that thread rather than at startup: it is slow to
+    # import and most sessions never get as far as the alarm. Without pygame or
+    # an audio device every call becomes a silent no-op.
+
+    def __init__(self, sounds=None):
+        self.sounds = dict(DEFAULT_SOUNDS if sounds is None else sounds)
+        self.available = None  # None until the mixer init has been attempted
+        self._pygame = None
+        self._loaded = {}
+        self._channels = {}
+        self._ramps = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = None
+        self._pending = None  # play() arguments held until the preload finishes
+
+    def preload(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._init, name="audio-preload", daemon=True)
+                self._thread.start()
+
+    def wait_ready(self, timeout=LOAD_TIMEOUT):
+        self.preload()
+        return self._ready.wait(timeout)
+
+    def add_sound(self, name, path):
+        with self._lock:
+            self.sounds[name] = path
+            if self.available:
+                self._load(name, path)
+
+    def play(self, name="alarm", loops=-1, volume=1.0, ramp_secs=0.0, ramp_from=0.0, wait=0.0):
+        # loops=-1 repeats until stop(); with ramp_secs the volume climbs
+        # from ramp_from to volume instead of starting at full blast.
+        # Waits at most wait seconds for a preload still running; past that the
+        # sound starts from the preload thread once it is ready (unless stop()
+        # comes first), so a UI thread never blocks on pygame.
+        if not self.wait_ready(wait):
+            with self._lock:
+                if not self._ready.is_set():
+                    self._pending = (name, loops, volume, ramp_secs, ramp_from)
+                    return True
+        if not self.available:
+            return False
+        with self._lock:
+            sound = self._loaded.get(name)
+            if sound is None:
+                return False
+            self._stop_locked(name)
+            sound.set_volume(ramp_from if ramp_secs > 0 else volume)
+            channel = sound.play(loops=loops)
+            if channel is None:
+                return False
+            self._channels[name] = channel
+            if ramp_secs > 0:
+                cancel = threading.Event()
+                self._ramps[name] = cancel
+                threading.Thread(target=self._ramp, args=(sound, ramp_from, volume, ramp_secs, cancel),
+                                 daemon=True).start()
+        return True
+
+    def stop(self, name=None):
+        with self._lock:
+            if name is None or (self._pending and self._pending[0] == name):
+                self._pending = None
+            for n in ([name] if name else list(self._channels)):
+                self._stop_locked(n)
+
+    # --- INTERNALS ---
+    def _init(self):
+        try:
+            import pygame
+            pygame.mixer.init()
+            self._pygame = pygame
+            with self._lock:
+                for name, path in self.sounds.items():
+                    self._load(name, path)
+            self.available = True
+        except Exception:
+            # No pygame, no audio device, or an unreadable file: stay silent
+            self.available = False
+        finally:
+            with self._lock:
+                self._ready.set()
+                pending, self._pending = self._pending, None
+        if pending and self.available:
+            self.play(*pending)
+
+    def _load(self, name, path):
+        try:
+            self._loaded[name] = self._pygame.mixer.Sound(path)
+        except Exception:
+            self._loaded.pop(name, None)
+
+    def _stop_locked(self, name):
+        cancel = self._ramps.pop(name, None)
+        if cancel:
+            cancel.set()
+        channel = self._channels.pop(name, None)
+        if channel is not None:
+            channel.stop()
+
+    def _ramp(self, sound, start, end, secs, cancel):
+        began = time.monotonic()
+        while not cancel.wait(RAMP_STEP):
+            progress = min(1.0, (time.monotonic() - began) / secs)
+            sound.set_volume(start + (end - start) * progress)
+            if progress >= 1.0:
+                return
+
+_service = None
+
+def get_service():
+    global _service
+    if _service is None:
+        _service = AudioService()
+    return _service
+
+def preload():
+    # Call when an alarm becomes possible (a countdown starts) so it is ready in time
+    get_service().preload()
+
+def play_alarm(wait=0.0):
+    # Returns at once by default (see AudioService.play); False when there is
+    # no audio to play it on
+    with metrics.span("audio.start"):
+        return get_service().play("alarm", loops=-1, wait=wait)
 
 def stop_alarm():
-    pygame.mixer.music.stop()
\ No newline at end of file
+    # Nothing can be playing if the service was never created
+    if _service is None:
+        return
+    _service.stop()
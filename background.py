@@ -0,0 +1,69 @@
+import queue
+import threading
+import time
+import metrics
+
+POLL_MS = 30
+
+class BackgroundLoader:
+    # Runs slow work (parsing, aggregating) on a worker thread and delivers the
+    # result on the Tk thread. Tk is not thread-safe, so the worker never touches
+    # a widget: it leaves its result in a queue that the Tk thread polls through
+    # the after/after_cancel pair it is given, like Ticker.
+    # Only the latest submit() is delivered; cancel() drops whatever is in flight
+    # (the worker still finishes, its result is just thrown away).
+
+    def __init__(self, after, after_cancel, poll_ms=POLL_MS):
+        self.after = after
+        self.after_cancel = after_cancel
+        self.poll_ms = poll_ms
+        self._results = queue.Queue()
+        self._generation = 0
+        self._callbacks = None
+        self._job = None
+
+    @property
+    def busy(self):
+        return self._callbacks is not None
+
+    def submit(self, work, on_done, on_error=None):
+        self._generation += 1
+        generation = self._generation
+        self._callbacks = (on_done, on_error)
+        threading.Thread(target=self._run, args=(generation, work), name="dashboard-load", daemon=True).start()
+        if self._job is None:
+            self._job = self.after(self.poll_ms, self._poll)
+
+    def cancel(self):
+        self._generation += 1
+        self._callbacks = None
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+
+    # --- INTERNALS ---
+    def _run(self, generation, work):
+        try:
+            self._results.put((generation, True, work(), time.perf_counter()))
+        except Exception as e:
+            self._results.put((generation, False, e, time.perf_counter()))
+
+    def _poll(self):
+        self._job = None
+        while True:
+            try:
+                generation, ok, value, done_at = self._results.get_nowait()
+            except queue.Empty:
+                break
+            # Time a finished result waited for the Tk thread to pick it up
+            metrics.observe("loader.deliver", (time.perf_counter() - done_at) * 1000)
+            if generation != self._generation or self._callbacks is None:
+                continue  # superseded or cancelled
+            on_done, on_error = self._callbacks
+            self._callbacks = None
+            if ok:
+                on_done(value)
+            elif on_error:
+                on_error(value)
+        if self._callbacks is not None:
+            self._job = self.after(self.poll_ms, self._poll)
@@ -0,0 +1,168 @@
+import sqlite3
+import sys
+from datetime import datetime
+
+BACKLOG_FILE = "backlog.db"
+DATE_FMT = "%Y-%m-%d %H:%M:%S"
+TODO, QUEUED, DOING, DONE = "todo", "queued", "doing", "done"
+OPEN = (TODO, QUEUED, DOING)
+OPEN_SQL = "(" + ", ".join(f"'{s}'" for s in OPEN) + ")"
+
+# title_key is the lower-cased title: prefix search is a range scan on its index
+# (key >= prefix AND key < prefix + "\uffff"), so typing stays O(log n + matches)
+# however many tasks pile up. Queued tasks are ordered by position.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    category TEXT,
+    est_mins REAL,
+    priority INTEGER DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'todo',
+    position REAL,
+    created_at TEXT,
+    done_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_title ON tasks(title_key);
+CREATE INDEX IF NOT EXISTS idx_tasks_browse ON tasks(category, status, priority);
+CREATE INDEX IF NOT EXISTS idx_tasks_queue ON tasks(status, position);
+"""
+FIELDS = "id, title, category, est_mins, priority, status, position"
+
+def title_key(title):
+    return " ".join(title.lower().split())
+
+class Backlog:
+    # Persistent to-do list behind the timer: tasks to pick from while typing,
+    # and a queue that "Start Next Task" pops from. Kept in its own database so
+    # it never races the session store's first-run CSV import.
+
+    def __init__(self, path=BACKLOG_FILE):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- WRITE ---
+    def add(self, title, category=None, est_mins=None, priority=0, status=TODO):
+        position = self._next_position() if status == QUEUED else None
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO tasks (title, title_key, category, est_mins, priority, status, position, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (title.strip(), title_key(title), category, est_mins, priority, status, position,
+                 datetime.now().strftime(DATE_FMT)))
+        return cur.lastrowid
+
+    def ensure(self, title, category=None, est_mins=None):
+        # The open task with this title, created if there is none (typed, not picked)
+        row = self.conn.execute(
+            f"SELECT id FROM tasks WHERE title_key = ? AND status IN {OPEN_SQL} ORDER BY id LIMIT 1",
+            (title_key(title),)).fetchone()
+        return row["id"] if row else self.add(title, category, est_mins)
+
+    def enqueue(self, task_id):
+        self._set(task_id, status=QUEUED, position=self._next_position())
+
+    def start(self, task_id):
+        self._set(task_id, status=DOING, position=None)
+
+    def complete(self, task_id):
+        self._set(task_id, status=DONE, position=None, done_at=datetime.now().strftime(DATE_FMT))
+
+    def reopen(self, task_id):
+        self._set(task_id, status=TODO, position=None, done_at=None)
+
+    def set_priority(self, task_id, priority):
+        self._set(task_id, priority=priority)
+
+    # --- READ ---
+    def get(self, task_id):
+        row = self.conn.execute(f"SELECT {FIELDS} FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return dict(row) if row else None
+
+    def search(self, prefix, limit=8, include_done=False):
+        # Open tasks whose title starts with prefix, highest priority first
+        key = title_key(prefix)
+        if not key:
+            return []
+        sql = f"SELECT {FIELDS} FROM tasks WHERE title_key >= ? AND title_key < ?"
+        if not include_done:
+            sql += f" AND status IN {OPEN_SQL}"
+        rows = self.conn.execute(sql + " ORDER BY priority DESC, title_key LIMIT ?",
+                                 (key, key + "\uffff", limit)).fetchall()
+        return [dict(r) for r in rows]
+
+    def tasks(self, category=None, status=None, limit=200):
+        sql, args = f"SELECT {FIELDS} FROM tasks WHERE 1 = 1", []
+        if category is not None:
+            sql += " AND category = ?"
+            args.append(category)
+        if status is not None:
+            sql += " AND status = ?"
+            args.append(status)
+        rows = self.conn.execute(sql + " ORDER BY priority DESC, id LIMIT ?", args + [limit]).fetchall()
+        return [dict(r) for r in rows]
+
+    def queue(self):
+        rows = self.conn.execute(f"SELECT {FIELDS} FROM tasks WHERE status = ? ORDER BY position",
+                                 (QUEUED,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def next_task(self):
+        # Front of the queue; with an empty queue, the most urgent open task
+        row = self.conn.execute(f"SELECT {FIELDS} FROM tasks WHERE status = ? ORDER BY position LIMIT 1",
+                                (QUEUED,)).fetchone()
+        if row is None:
+            row = self.conn.execute(f"SELECT {FIELDS} FROM tasks WHERE status = ? ORDER BY priority DESC, id LIMIT 1",
+                                    (TODO,)).fetchone()
+        return dict(row) if row else None
+
+    # --- INTERNALS ---
+    def _next_position(self):
+        row = self.conn.execute("SELECT MAX(position) FROM tasks WHERE status = ?", (QUEUED,)).fetchone()
+        return (row[0] or 0) + 1
+
+    def _set(self, task_id, **values):
+        with self.conn:
+            self.conn.execute(f"UPDATE tasks SET {', '.join(f'{k} = ?' for k in values)} WHERE id = ?",
+                              (*values.values(), task_id))
+
+def main(argv):
+    # python backlog.py add "title" [category] [est_mins] [priority]
+    # python backlog.py queue "title" [category] [est_mins]
+    # python backlog.py list [category]
+    # python backlog.py search prefix
+    if len(argv) < 2 or argv[1] not in ("add", "queue", "list", "search"):
+        print('Usage: python backlog.py add|queue "title" [category] [est_mins] [priority]')
+        print("       python backlog.py list [category]")
+        print("       python backlog.py search prefix")
+        return
+    command, args = argv[1], argv[2:]
+    with Backlog() as backlog:
+        if command in ("add", "queue"):
+            title, category = args[0], args[1] if len(args) > 1 else None
+            est = float(args[2]) if len(args) > 2 else None
+            priority = int(args[3]) if len(args) > 3 else 0
+            task_id = backlog.add(title, category, est, priority, QUEUED if command == "queue" else TODO)
+            print(f"✅ #{task_id} {title}")
+            return
+        if command == "list":
+            rows = backlog.queue() + backlog.tasks(args[0] if args else None, TODO)
+        else:
+            rows = backlog.search(" ".join(args))
+        for t in rows:
+            est = f"{t['est_mins']:g}m" if t["est_mins"] else "-"
+            print(f"#{t['id']:<5} {t['status']:<7} p{t['priority']} [{t['category'] or '-'}] {t['title']} ({est})")
+
+if __name__ == "__main__":
+    main(sys.argv)
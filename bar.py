@@ -1,9 +1,17 @@
+import math
+import os
 import customtkinter as ctk
-import pandas as pd
 import tkinter as tk
 from datetime import datetime, timedelta
+from bucketing import focus_by_bin, bin_label
+from session_schema import load_sessions, load_range, report_bad
+from session_store import LOG_FILE
 
 class HybridTimelineChart(ctk.CTk):
+    bin_minutes = 60
+    # With a real log, the last days of it (only their partitions are read)
+    days = 3
+
     def __init__(self):
         super().__init__()
         self.title("FlowClock: Hybrid Density Dashboard")
@@ -15,47 +23,27 @@ class HybridTimelineChart(ctk.CTk):
         self.header.pack(pady=(30, 10))
 
         try:
-            # Note: Ensure you run your simulate_data.py first to create this file!
-            df = pd.read_csv("test_sessions.csv")
+            if os.path.isfile(LOG_FILE):
+                end = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time())
+                df, bad = load_range(end - timedelta(days=self.days), end)
+                source = LOG_FILE
+            else:
+                # Note: Ensure you run your simulate_data.py first to create this file!
+                df, bad = load_sessions("test_sessions.csv")
+                source = "test_sessions.csv"
+            report_bad(bad, source)
             self.render_chart(df)
         except Exception as e:
             # This captures the error you saw in your screenshot
             ctk.CTkLabel(self, text=f"Error: {e}", text_color="red").pack(pady=20)
 
     def render_chart(self, df):
-        # --- 1. DATA PRE-PROCESSING ---
-        df['End_TS'] = pd.to_datetime(df['Date'])
-        df['Start_TS'] = df.apply(lambda row: row['End_TS'] - timedelta(minutes=row['Actual_Mins']), axis=1)
-        
-        # Determine day start/end based on your data
-        min_hour = int(df['Start_TS'].min().hour)
-        max_hour = int(df['End_TS'].max().hour)
-        full_range = list(range(min_hour, max_hour + 1))
-
-        # --- 2. HYBRID LOGIC CALCULATION ---
-        hourly_display_val = {}
-        base_date = df['Start_TS'].min().date()
-        
-        for hour in full_range:
-            # Define hour window using datetime.combine
-            h_start = datetime.combine(base_date, datetime.min.time()).replace(hour=hour)
-            h_end = h_start + timedelta(hours=1)
-            
-            total_weighted_focus = 0
-            total_active_mins = 0
-            
-            for _, session in df.iterrows():
-                overlap_start = max(session['Start_TS'], h_start)
-                overlap_end = min(session['End_TS'], h_end)
-                
-                if overlap_start < overlap_end:
-                    duration_in_hour = (overlap_end - overlap_start).total_seconds() / 60
-                    total_weighted_focus += (session['Focus_Level'] * duration_in_hour)
-                    total_active_mins += duration_in_hour
-            
-            # Hybrid Rule: Quality average over active time only
-            if total_active_mins > 0:
-                hourly_display_val[hour] = total_weighted_focus / total_active_mins
+        # --- 1 & 2. HYBRID LOGIC CALCULATION ---
+        # Quality average over active time only, split per hour in one vectorized pass
+        bins = focus_by_bin(df, self.bin_minutes)
+        full_range = list(bins.index)
+        hourly_display_val = {ts: val for ts, val, mins in zip(bins.index, bins['Focus'], bins['Active_Mins'])
+                              if mins > 0 and not math.isnan(val)}
 
         # --- 3. RENDERING ---
         c_width, c_height = 800, 350
@@ -74,14 +62,19 @@ class HybridTimelineChart(ctk.CTk):
 
         # --- 4. BARS ---
         num_slots = len(full_range)
-        bar_width = ((c_width - 2*padding_x) - (num_slots * 10)) / num_slots
+        gap = min(10, (c_width - 2*padding_x) / num_slots * 0.3)
+        bar_width = ((c_width - 2*padding_x) - (num_slots * gap)) / num_slots
+        # Several days of bins: label what fits and name the day at midnight
+        label_every = max(1, math.ceil(num_slots * 40 / (c_width - 2*padding_x)))
+        day_fmt = "%a" if full_range[0].date() != full_range[-1].date() else None
 
         for i, hour in enumerate(full_range):
-            x0 = padding_x + (i * (bar_width + 10))
+            x0 = padding_x + (i * (bar_width + gap))
             x1 = x0 + bar_width
             y_base = c_height - padding_y
             
-            canvas.create_text((x0+x1)/2, y_base + 25, text=f"{hour}:00", fill="#888888")
+            if i % label_every == 0:
+                canvas.create_text((x0+x1)/2, y_base + 25, text=bin_label(hour, self.bin_minutes, "{h}:00", day_fmt), fill="#888888")
 
             if hour in hourly_display_val:
                 val = hourly_display_val[hour]
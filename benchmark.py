@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Times the paths the dashboard and the loggers depend on, against a synthetic
+# log from sim_data, and appends the results to bench_results.jsonl. Each run is
+# compared with the last saved run of the same size; anything more than
+# --tolerance slower is reported as a regression (and fails the run with --check).
+#
+#   python benchmark.py                      # 1M sessions, compare, save
+#   python benchmark.py --sessions 200000 --check --no-save
+
+RESULTS_FILE = "bench_results.jsonl"
+# Fixed end date so every run of the same size benchmarks the same data
+DATA_END = datetime(2026, 1, 31)
+DAYS, USERS = 365, 3
+# Timings this close are within run-to-run noise, whatever the ratio
+MIN_DELTA = 0.005
+
+def best_of(repeat, fn):
+    # Fastest of repeat runs: the least noisy estimate of what the code costs
+    times = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - began)
+    return min(times)
+
+def data_file(sessions, seed, data_dir):
+    from sim_data import generate_sessions
+    path = os.path.join(data_dir, f"sim_{sessions}_{seed}.csv")
+    if not os.path.isfile(path):
+        print(f"Generating {sessions} sessions -> {path}")
+        generate_sessions(path, DAYS, USERS, sessions / (DAYS * USERS), seed=seed, end=DATA_END)
+    return path
+
+def run(path, repeat, log_rows):
+    from aggregate import aggregate_csv, summarize_frame
+    from bucketing import focus_by_bin
+    from csv_tail import CsvTail
+    from logger import SessionWriter
+    from session_schema import load_sessions
+    from session_store import session_row
+
+    results = {}
+    def record(name, seconds, rows=None):
+        results[name] = round(seconds, 5)
+        rate = f"  ({rows / seconds:,.0f} rows/s)" if rows and seconds else ""
+        print(f"  {name:<22}{seconds * 1000:>10.1f} ms{rate}")
+
+    # 1. Loading the whole log
+    seconds = best_of(repeat, lambda: load_sessions(path))
+    df = load_sessions(path)[0]
+    record("load_csv", seconds, len(df))
+    day = DATA_END.date()
+
+    # 2. Today's rows: the dashboard's tail reader (first open, then a refresh) and a pandas filter
+    record("today_tail_cold", best_of(repeat, lambda: CsvTail(path).read_day(day)))
+    tail = CsvTail(path)
+    tail.read_day(day)
+    record("today_tail_warm", best_of(repeat, lambda: tail.read_day(day)))
+    start = datetime.combine(day, datetime.min.time())
+    today = df[df["End"] >= start]
+    record("today_filter_pandas", best_of(repeat, lambda: df[df["End"] >= start]), len(df))
+
+    # 3. Hourly bucketing and the donut, as the Today view computes them
+    record("bucketing_today", best_of(repeat, lambda: focus_by_bin(today)), len(today))
+    week = df[df["End"] >= start - timedelta(days=6)]
+    record("bucketing_week", best_of(repeat, lambda: focus_by_bin(week)), len(week))
+    record("donut_all", best_of(repeat, lambda: df.groupby("Category", observed=True)["Actual_Mins"].sum()), len(df))
+    record("summary_today", best_of(repeat, lambda: summarize_frame(today)), len(today))
+
+    # 4. Range views: a month streamed through the aggregator
+    record("range_month_csv", best_of(1, lambda: aggregate_csv(path, start - timedelta(days=30), start + timedelta(days=1), report=None)))
+
+    # 5. Logging throughput, with the buffered writer as the GUI and CLI use it
+    row = session_row(datetime.now(), None, "Work", "bench", 25, 25.0, "Yes", "", 4, "bench")
+    def log(use_store):
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            os.chdir(tmp)  # the store is created next to the log
+            try:
+                began = time.perf_counter()
+                with SessionWriter("sessions.csv", use_store=use_store) as writer:
+                    for _ in range(log_rows):
+                        writer.write(row)
+                return time.perf_counter() - began
+            finally:
+                os.chdir(cwd)
+    record("log_csv", min(log(False) for _ in range(repeat)), log_rows)
+    record("log_csv_and_store", min(log(True) for _ in range(repeat)), log_rows)
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def last_run(results_file, sessions):
+    if not os.path.isfile(results_file):
+        return None
+    previous = None
+    with open(results_file) as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry.get("sessions") == sessions:
+                previous = entry
+    return previous
+
+def compare(results, previous, tolerance):
+    regressions = []
+    for name, seconds in results.items():
+        before = previous["results"].get(name)
+        if before and seconds > before * (1 + tolerance) and seconds - before > MIN_DELTA:
+            regressions.append(name)
+            print(f"  ⚠️ {name}: {before * 1000:.1f} -> {seconds * 1000:.1f} ms ({seconds / before:.2f}x)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FlowClock loading, bucketing and logging")
+    parser.add_argument("--sessions", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--log-rows", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=tempfile.gettempdir(), help="where generated logs are cached")
+    parser.add_argument("--results", default=RESULTS_FILE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="slowdown that counts as a regression")
+    parser.add_argument("--check", action="store_true", help="exit 1 on a regression")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    path = data_file(args.sessions, args.seed, args.data_dir)
+    print(f"Benchmarking {path}")
+    results = run(path, args.repeat, args.log_rows)
+
+    previous = last_run(args.results, args.sessions)
+    regressions = []
+    if previous:
+        print(f"Compared with {previous['when']} ({previous.get('commit')}):")
+        regressions = compare(results, previous, args.tolerance)
+        if not regressions:
+            print("  ✅ no regressions")
+
+    if not args.no_save:
+        entry = {"when": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "commit": git_commit(),
+                 "sessions": args.sessions, "python": platform.python_version(), "results": results}
+        with open(args.results, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+    if regressions and args.check:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from session_schema import parse_dates
+
+# Column order of the weight matrix handed to split_intervals()
+ACTIVE, WEIGHTED, RATED = 0, 1, 2
+
+def add_timestamps(df):
+    # Charts count active minutes, so sessions are laid back Actual_Mins from
+    # their end (the logged Start..End span would also cover pauses).
+    # Frames from session_schema already carry parsed dates.
+    date = df['End'] if 'End' in df else df['Date']
+    df['End_TS'] = date if pd.api.types.is_datetime64_any_dtype(date) else parse_dates(date)
+    df['Start_TS'] = df['End_TS'] - pd.to_timedelta(df['Actual_Mins'], unit='m')
+    return df
+
+def split_intervals(starts, ends, weights, n_bins, bin_size):
+    # starts/ends are offsets from the left edge of bin 0 (same unit as bin_size),
+    # weights is (n_sessions, k). Returns (n_bins, k): sum of weight * overlap per bin.
+    # Each session touches at most a head bin, a tail bin and a run of full bins in
+    # between; the full run goes through a difference array so the cost is
+    # O(sessions + bins) no matter how long the sessions are.
+    weights = np.asarray(weights, dtype=float)
+    out = np.zeros((n_bins, weights.shape[1]))
+    if n_bins <= 0:
+        return out
+
+    span = n_bins * bin_size
+    starts = np.clip(np.asarray(starts, dtype=float), 0, span)
+    ends = np.clip(np.asarray(ends, dtype=float), 0, span)
+    valid = ends > starts
+    s, e, w = starts[valid], ends[valid], weights[valid]
+
+    first = np.minimum((s // bin_size).astype(np.int64), n_bins - 1)
+    last = np.minimum(np.ceil(e / bin_size).astype(np.int64) - 1, n_bins - 1)
+
+    # 1. Sessions that start and end inside the same bin
+    one = first == last
+    np.add.at(out, first[one], w[one] * (e[one] - s[one])[:, None])
+
+    # 2. Partial head and tail bins of the longer sessions
+    many = ~one
+    f, l, wm = first[many], last[many], w[many]
+    np.add.at(out, f, wm * ((f + 1) * bin_size - s[many])[:, None])
+    np.add.at(out, l, wm * (e[many] - l * bin_size)[:, None])
+
+    # 3. Full bins strictly between head and tail
+    diff = np.zeros((n_bins + 1, weights.shape[1]))
+    np.add.at(diff, f + 1, wm * bin_size)
+    np.add.at(diff, l, -wm * bin_size)
+    out += np.cumsum(diff, axis=0)[:n_bins]
+    return out
+
+def focus_by_bin(df, bin_minutes=60):
+    # Duration-weighted focus per time bin, over the rated minutes in it (unrated
+    # sessions count as active time but not towards focus, as in the rollups),
+    # over absolute time: bins run from the
+    # bin holding the earliest start to the bin holding the latest end, across
+    # midnight and over as many days as the sessions cover. The cost is
+    # O(sessions + bins), whatever the range.
+    df = add_timestamps(df.copy())
+    if df.empty:
+        return pd.DataFrame({'Active_Mins': [], 'Focus': []}, index=pd.DatetimeIndex([]))
+    bin_size = pd.Timedelta(minutes=bin_minutes)
+    origin = df['Start_TS'].min().floor(bin_size)
+    # The bin the last session ends in is drawn even when it ends right on its edge
+    n_bins = int((df['End_TS'].max() - origin) // bin_size) + 1
+
+    focus = df['Focus_Level'].to_numpy(dtype=float, na_value=np.nan)
+    missing = np.isnan(focus)
+    weights = np.column_stack([np.ones(len(df)), np.where(missing, 0.0, focus), ~missing])
+
+    to_mins = lambda ts: ((ts - origin) / pd.Timedelta(minutes=1)).to_numpy(dtype=float)
+    sums = split_intervals(to_mins(df['Start_TS']), to_mins(df['End_TS']), weights, n_bins, bin_minutes)
+
+    active, rated = sums[:, ACTIVE], sums[:, RATED]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        value = np.where(rated > 0, sums[:, WEIGHTED] / rated, np.nan)
+
+    index = origin + pd.to_timedelta(np.arange(n_bins) * bin_minutes, unit='m')
+    return pd.DataFrame({'Active_Mins': active, 'Focus': value}, index=index)
+
+def bin_label(ts, bin_minutes=60, hour_fmt="{h}h", day_fmt=None):
+    # With day_fmt, midnight is labelled with the day so multi-day charts stay readable
+    if day_fmt and ts.hour == 0 and ts.minute == 0:
+        return ts.strftime(day_fmt)
+    if bin_minutes % 60 == 0:
+        return hour_fmt.format(h=ts.hour)
+    return f"{ts.hour}:{ts.minute:02d}"
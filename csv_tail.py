@@ -0,0 +1,107 @@
+import csv
+import io
+import os
+import re
+
+BLOCK_SIZE = 64 * 1024
+# A session record starts with its timestamp; anything else at the start of a
+# line is the continuation of a multi-line quoted Notes field
+RECORD_START = re.compile(rb"\d{4}-\d{2}-\d{2} \d{2}:\d{2}")
+
+class CsvTail:
+    # Incremental reader for an append-only, time-ordered session CSV.
+    # Remembers the byte offset it has parsed up to and the rows already seen
+    # for the current day, so each refresh only parses newly appended rows.
+
+    def __init__(self, path):
+        self.path = path
+        self.header = None
+        self.day = None
+        self.offset = None
+        self.rows = []
+        self._file_id = None
+
+    def read_day(self, day):
+        day_str = day.strftime("%Y-%m-%d")
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self.reset()
+            return []
+
+        file_id = (st.st_dev, st.st_ino)
+        if self.day != day_str or self.offset is None or file_id != self._file_id or st.st_size < self.offset:
+            # New day, first call, or the file was replaced/truncated: locate today again
+            self.reset()
+            self.day, self._file_id = day_str, file_id
+            self.header = self._read_header()
+            self.offset = self._find_day_start(day_str.encode(), st.st_size)
+
+        if st.st_size > self.offset:
+            self._read_new_rows(day_str)
+        return list(self.rows)
+
+    def reset(self):
+        self.day = self.offset = self._file_id = None
+        self.rows = []
+
+    def feed(self, start, data):
+        # Whole rows this process just appended at byte offset start: taken as
+        # read without going back to the file. If anything else was appended in
+        # between, the offsets don't line up and read_day picks it all up from disk.
+        if self.day is None or self.offset != start:
+            return False
+        self._consume(data, self.day)
+        return True
+
+    # --- INTERNALS ---
+    def _read_header(self):
+        with open(self.path, newline="") as f:
+            return next(csv.reader(f), None)
+
+    def _find_day_start(self, day_bytes, size):
+        # Walk backwards from EOF one block at a time. Every record start dated
+        # today moves the candidate offset back; the first older record stops the scan.
+        start = size
+        with open(self.path, "rb") as f:
+            pos, carry = size, b""
+            while pos > 0:
+                read = min(BLOCK_SIZE, pos)
+                pos -= read
+                f.seek(pos)
+                buf = f.read(read) + carry
+                nl = buf.rfind(b"\n", 0, len(buf) - 1 if buf.endswith(b"\n") else len(buf))
+                end = len(buf)
+                while nl != -1:
+                    line_start = nl + 1
+                    if line_start < end and RECORD_START.match(buf, line_start):
+                        if buf[line_start:line_start + 10] < day_bytes:
+                            return start
+                        start = pos + line_start
+                    end = nl
+                    nl = buf.rfind(b"\n", 0, nl)
+                # Bytes before the first newline belong to a line that began in an earlier block
+                carry = buf[:end]
+            if RECORD_START.match(carry) and carry[:10] >= day_bytes:
+                start = 0
+        return start
+
+    def _read_new_rows(self, day_str):
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+
+        # Only consume whole records: stop at the last newline that is not inside
+        # an open quote, so a row being written right now is picked up next time
+        cut = data.rfind(b"\n")
+        while cut != -1 and data.count(b'"', 0, cut) % 2:
+            cut = data.rfind(b"\n", 0, cut)
+        if cut == -1:
+            return
+        self._consume(data[:cut + 1], day_str)
+
+    def _consume(self, chunk, day_str):
+        self.offset += len(chunk)
+        for row in csv.reader(io.StringIO(chunk.decode("utf-8"), newline="")):
+            if row and row[0].startswith(day_str):
+                self.rows.append(row)
@@ -1,15 +1,88 @@
 import customtkinter as ctk
-import pandas as pd
+import math
 import tkinter as tk
 from datetime import datetime, timedelta
+from bucketing import bin_label
+from session_store import SessionStore
+from session_schema import frame_from_rows, report_bad
+from aggregate import aggregate_store, summarize_frame, summarize_rollups, WEEKDAYS
+from session_cache import TodaySessions
+from background import BackgroundLoader
+import metrics
+
+# Used by windows opened without the app's own TodaySessions, so they still
+# share today's parsed rows
+_today_sessions = TodaySessions()
+
+def view_range(view, today):
+    # First and last day (inclusive) covered by a multi-day view
+    if view == "Week":
+        return today - timedelta(days=today.weekday()), today
+    if view == "Month":
+        return today.replace(day=1), today
+    raise ValueError(view)
+
+# --- LOADING (worker thread: no widgets in here) ---
+@metrics.timed("dashboard.load_today")
+def load_today_summary(sessions, bin_minutes=60):
+    # Today's rows are held in memory by sessions (see TodaySessions), and the
+    # summary is only recomputed when they change. Older days are served by
+    # the date-indexed store.
+    rows, header, version = sessions.rows()
+    if rows:
+        def summarize():
+            df, bad = frame_from_rows(rows, header)
+            report_bad(bad, sessions.path)
+            return summarize_frame(df, bin_minutes)
+        return sessions.memo(("summary", bin_minutes), version, summarize)
+    with SessionStore() as store:
+        last_day = store.last_day()
+        if last_day is None:
+            raise ValueError("No sessions logged")
+        if bin_minutes == 60:
+            summary = summarize_rollups(store, last_day, last_day)
+        else:
+            df, bad = frame_from_rows(store.query_day(last_day))
+            summary = summarize_frame(df, bin_minutes)
+    if summary is None:
+        raise ValueError("No sessions logged")
+    return summary
+
+@metrics.timed("dashboard.search")
+def search_sessions(query, limit=100):
+    # Latest sessions whose task or notes contain every word of query (see text_index)
+    if not query:
+        return []
+    with SessionStore() as store:
+        return store.search(query, limit)
+
+@metrics.timed("dashboard.load_range")
+def load_range_summary(first, last):
+    # Streams the store's range scan in chunks, so memory stays bounded for any range
+    start = datetime.combine(first, datetime.min.time())
+    with SessionStore() as store:
+        agg = aggregate_store(store, start, start + timedelta(days=(last - first).days + 1))
+    if agg.sessions == 0:
+        raise ValueError("No sessions in range")
+    return agg.summary()
 
 class DashboardWindow(ctk.CTkToplevel):
-    def __init__(self, *args, **kwargs):
+    # Width of the "Focus by Hour" bars; 30 or 15 splits each hour further
+    bin_minutes = 60
+    views = ["Today", "Week", "Month", "Range", "Search"]
+    titles = {"Today": "DAILY FLOW DASHBOARD", "Week": "WEEKLY FLOW DASHBOARD",
+              "Month": "MONTHLY FLOW DASHBOARD", "Range": "FLOW DASHBOARD", "Search": "SEARCH SESSIONS"}
+    colors = ['#3a7ebf', '#16a085', '#f1c40f', '#e67e22', '#9b59b6']
+
+    def __init__(self, *args, sessions=None, **kwargs):
         super().__init__(*args, **kwargs)
+        self.sessions = sessions or _today_sessions
         self.title("FlowClock")
         self.geometry("550x850") 
         self.attributes("-topmost", True)
         self.configure(fg_color="#121212") 
+        # Closing only hides the window; refresh() brings it back with new data
+        self.protocol("WM_DELETE_WINDOW", self.close)
         
         self.container = ctk.CTkFrame(self, fg_color="transparent")
         self.container.pack(fill="both", expand=True, padx=25, pady=20)
@@ -17,137 +90,371 @@ class DashboardWindow(ctk.CTkToplevel):
         # Updated title: Smaller font and new text
         header_frame = ctk.CTkFrame(self.container, fg_color="transparent")
         header_frame.pack(fill="x", pady=(0, 20))
-        ctk.CTkLabel(header_frame, text="DAILY FLOW DASHBOARD", 
-                     font=("Helvetica", 20, "bold"), text_color="#BBD1E5").pack(expand=True, fill="x")
-
-        self.load_today_data()
-
-    def load_today_data(self):
-        try:
-            df = pd.read_csv("focus_sessions.csv")
-            today_str = datetime.now().strftime("%Y-%m-%d")
-            today_data = df[df['Date'].str.contains(today_str)].copy()
-            data_to_render = today_data if not today_data.empty else df
-            self.render_dashboard(data_to_render)
-        except Exception as e:
-            ctk.CTkLabel(self.container, text=f"No data yet. Keep flowing!", text_color="#888888").pack(pady=40)
-
-    def render_dashboard(self, data):
+        self.title_label = ctk.CTkLabel(header_frame, text=self.titles["Today"], 
+                     font=("Helvetica", 20, "bold"), text_color="#BBD1E5")
+        self.title_label.pack(expand=True, fill="x")
+
+        # View selector: today, this week, this month or a custom date range
+        self.view_var = ctk.StringVar(value="Today")
+        ctk.CTkSegmentedButton(self.container, values=self.views, variable=self.view_var,
+                               command=lambda view: self.load_view()).pack(pady=(0, 10))
+        self.range_frame = ctk.CTkFrame(self.container, fg_color="transparent")
+        self.range_from = ctk.CTkEntry(self.range_frame, placeholder_text="From YYYY-MM-DD", width=150)
+        self.range_from.pack(side="left", padx=5)
+        self.range_to = ctk.CTkEntry(self.range_frame, placeholder_text="To YYYY-MM-DD", width=150)
+        self.range_to.pack(side="left", padx=5)
+        ctk.CTkButton(self.range_frame, text="Apply", width=70, command=self.load_view).pack(side="left", padx=5)
+        # Search box: results follow the typing, once it pauses
+        self.search_entry = ctk.CTkEntry(self.container, placeholder_text="Search tasks and notes…", width=400)
+        self.search_entry.bind("<KeyRelease>", self.on_search_typed)
+        self.search_entry.bind("<Return>", lambda e: self.load_view())
+        self._search_job = None
+
+        # Every widget and canvas item is created once; refreshes only update
+        # the items whose value changed
+        self._item_state = {}
+        self.loader = BackgroundLoader(self.after, self.after_cancel)
+        self.setup_layout()
+        self.load_view()
+
+    def refresh(self):
+        self.load_view()
+        self.deiconify()
+        self.lift()
+
+    def close(self):
+        # Nothing may arrive for a hidden window; refresh() loads afresh
+        self.loader.cancel()
+        self.set_loading(False)
+        self.withdraw()
+
+    def load_view(self):
+        # Inputs are read here on the Tk thread; the loading itself runs on a
+        # worker so the timer sharing this main loop keeps ticking
+        view = self.view_var.get()
+        self.set_label(self.title_label, text=self.titles[view])
+        if view == "Search":
+            self.range_frame.pack_forget()
+            self.content.pack_forget()
+            self.empty_label.pack_forget()
+            if not self.search_entry.winfo_manager():
+                busy = self.loading_label if self.loading_label.winfo_manager() else None
+                self.search_entry.pack(pady=(0, 10), before=busy)
+                self.results_frame.pack(fill="both", expand=True)
+            query = self.search_entry.get().strip()
+            self.set_loading(True)
+            self.loader.submit(lambda: search_sessions(query), self.show_results, self.show_empty)
+            return
+        self.search_entry.pack_forget()
+        self.results_frame.pack_forget()
+        if view == "Range":
+            if not self.range_frame.winfo_manager():
+                # Keep the date entries above whatever is currently shown
+                below = next((w for w in (self.loading_label, self.content, self.empty_label) if w.winfo_manager()), None)
+                self.range_frame.pack(pady=(0, 10), before=below)
+        else:
+            self.range_frame.pack_forget()
+
+        if view == "Today":
+            work = lambda bin_minutes=self.bin_minutes: load_today_summary(self.sessions, bin_minutes)
+        else:
+            try:
+                if view == "Range":
+                    first = datetime.strptime(self.range_from.get().strip(), "%Y-%m-%d").date()
+                    last = datetime.strptime(self.range_to.get().strip(), "%Y-%m-%d").date()
+                else:
+                    first, last = view_range(view, datetime.now().date())
+            except ValueError as e:
+                self.show_empty(e)
+                return
+            work = lambda: load_range_summary(first, last)
+        self.set_loading(True)
+        self.loader.submit(work, self.show_summary, self.show_empty)
+
+    def show_summary(self, summary):
+        self.set_loading(False)
+        self.render_dashboard(summary)
+
+    def on_search_typed(self, event=None):
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(200, self.run_search)
+
+    def run_search(self):
+        self._search_job = None
+        self.load_view()
+
+    def show_results(self, rows):
+        self.set_loading(False)
+        self.render_results(rows)
+
+    def show_empty(self, error=None):
+        self.set_loading(False)
+        self.content.pack_forget()
+        self.results_frame.pack_forget()
+        if not self.empty_label.winfo_manager():
+            self.empty_label.pack(pady=40)
+
+    def set_loading(self, loading):
+        # Whatever was on screen stays there (greyed-out title) until the new data lands
+        if loading and not self.loading_label.winfo_manager():
+            below = next((w for w in (self.content, self.empty_label, self.results_frame) if w.winfo_manager()), None)
+            self.loading_label.pack(pady=(0, 10), before=below)
+        elif not loading:
+            self.loading_label.pack_forget()
+        self.set_label(self.title_label, text_color="#666666" if loading else "#BBD1E5")
+
+    # --- LAYOUT (built once) ---
+    def setup_layout(self):
+        self.empty_label = ctk.CTkLabel(self.container, text=f"No data yet. Keep flowing!", text_color="#888888")
+        self.loading_label = ctk.CTkLabel(self.container, text="Loading…", text_color="#888888")
+        self.content = ctk.CTkFrame(self.container, fg_color="transparent")
+        # Search results: a pool of rows, grown as needed and reused (like the legend)
+        self.results_frame = ctk.CTkScrollableFrame(self.container, fg_color="#1E1E1E", corner_radius=12)
+        self.results_count = ctk.CTkLabel(self.results_frame, text="", font=("Helvetica", 11, "bold"), text_color="#AAAAAA")
+        self.results_count.pack(anchor="w", padx=10, pady=(10, 5))
+        self.result_rows = []
+
         # 1. KPI SECTION
-        kpi_frame = ctk.CTkFrame(self.container, fg_color="transparent")
+        kpi_frame = ctk.CTkFrame(self.content, fg_color="transparent")
         kpi_frame.pack(fill="x", pady=(0, 20))
-        
+        self.kpi_values = {}
+        for label in ("TOTAL TIME", "AVG FOCUS"):
+            card = ctk.CTkFrame(kpi_frame, fg_color="#1E1E1E", corner_radius=12, width=240, height=80)
+            card.pack(side="left", expand=True, padx=5)
+            card.pack_propagate(False)
+            ctk.CTkLabel(card, text=label, font=("Helvetica", 10, "bold"), text_color="#AAAAAA").pack(pady=(15, 2))
+            # Updated Stats: Both use #FFFFFF (Pure White)
+            self.kpi_values[label] = ctk.CTkLabel(card, text="", font=("Helvetica", 18, "bold"), text_color="#FFFFFF")
+            self.kpi_values[label].pack()
+
+        # 2. CATEGORY CHART
+        ctk.CTkLabel(self.content, text="TIME DISTRIBUTION", font=("Helvetica", 11, "bold"), 
+                     text_color="#AAAAAA").pack(anchor="w", padx=5, pady=(10, 5))
+        chart_container = ctk.CTkFrame(self.content, fg_color="#1E1E1E", corner_radius=12)
+        chart_container.pack(fill="x", pady=5)
+        self.donut = tk.Canvas(chart_container, width=150, height=150, bg="#1E1E1E", highlightthickness=0)
+        self.donut.pack(side="left", padx=20, pady=15)
+        self.donut_hole = self.donut.create_oval((50, 50, 100, 100), fill="#1E1E1E", outline="#1E1E1E")
+        self.donut_arcs = []
+        self.legend_frame = ctk.CTkFrame(chart_container, fg_color="transparent")
+        self.legend_frame.pack(side="left", fill="y", pady=15)
+        self.legend_rows = []
+
+        # 3. HOURLY CHART (single day)
+        self.hour_section = ctk.CTkFrame(self.content, fg_color="transparent")
+        ctk.CTkLabel(self.hour_section, text="FOCUS BY HOUR", font=("Helvetica", 11, "bold"), 
+                     text_color="#AAAAAA").pack(anchor="w", padx=5, pady=(20, 5))
+        chart_bg = ctk.CTkFrame(self.hour_section, fg_color="#1E1E1E", corner_radius=12)
+        chart_bg.pack(fill="x", pady=5)
+        self.c_w, self.c_h = 480, 200
+        self.px, self.py = 40, 30
+        self.bars = tk.Canvas(chart_bg, width=self.c_w, height=self.c_h, bg="#1E1E1E", highlightthickness=0)
+        self.bars.pack(pady=(15, 5))
+        for i in range(1, 6):
+            y = (self.c_h - self.py) - (i * ((self.c_h - 2*self.py) / 5))
+            self.bars.create_line(self.px, y, self.c_w - self.px, y, fill="#2A2A2A", dash=(2, 2))
+            self.bars.create_text(self.px - 15, y, text=str(i), fill="#666666", font=("Helvetica", 9))
+        self.bar_slots = []
+
+        legend = ctk.CTkFrame(chart_bg, fg_color="transparent")
+        legend.pack(pady=(0, 10))
+        ctk.CTkFrame(legend, width=10, height=10, fg_color="#3a7ebf", corner_radius=2).pack(side="left", padx=5)
+        ctk.CTkLabel(legend, text="Focus Quality (1-5)", font=("Helvetica", 10), text_color="#888888").pack(side="left")
+        self.hour_section.pack(fill="x")
+
+        # 4. WEEKDAY x HOUR HEATMAP (multi-day views, shown instead of the hourly bars)
+        self.heat_section = ctk.CTkFrame(self.content, fg_color="transparent")
+        ctk.CTkLabel(self.heat_section, text="FOCUS BY WEEKDAY & HOUR", font=("Helvetica", 11, "bold"), 
+                     text_color="#AAAAAA").pack(anchor="w", padx=5, pady=(20, 5))
+        heat_bg = ctk.CTkFrame(self.heat_section, fg_color="#1E1E1E", corner_radius=12)
+        heat_bg.pack(fill="x", pady=5)
+        cell, hx, hy = 18, 40, 10
+        self.heat = tk.Canvas(heat_bg, width=hx + 24 * cell + 10, height=hy + 7 * cell + 25,
+                              bg="#1E1E1E", highlightthickness=0)
+        self.heat.pack(pady=(15, 10))
+        self.heat_cells = [[self.heat.create_rectangle(hx + h * cell, hy + d * cell, hx + (h + 1) * cell - 2,
+                                                       hy + (d + 1) * cell - 2, fill="#262626", outline="")
+                            for h in range(24)] for d in range(7)]
+        for d, name in enumerate(WEEKDAYS):
+            self.heat.create_text(hx - 20, hy + d * cell + cell / 2 - 1, text=name, fill="#666666", font=("Helvetica", 8))
+        for h in range(0, 24, 3):
+            self.heat.create_text(hx + h * cell + cell / 2, hy + 7 * cell + 10, text=f"{h}h", fill="#666666", font=("Helvetica", 8))
+
+    # --- DIFF HELPERS ---
+    def update_item(self, canvas, item, coords=None, **options):
+        # coords()/itemconfig() only for what differs from the last call for this item
+        last_coords, last_options = self._item_state.get((canvas, item), (None, {}))
+        if coords is not None:
+            coords = tuple(round(c, 1) for c in coords)
+            if coords != last_coords:
+                canvas.coords(item, *coords)
+                last_coords = coords
+        changed = {k: v for k, v in options.items() if last_options.get(k) != v}
+        if changed:
+            canvas.itemconfig(item, **changed)
+            last_options = {**last_options, **changed}
+        self._item_state[(canvas, item)] = (last_coords, last_options)
+
+    def set_label(self, label, **options):
+        changed = {k: v for k, v in options.items() if label.cget(k) != v}
+        if changed:
+            label.configure(**changed)
+
+    # --- RENDERING ---
+    @metrics.timed("dashboard.render")
+    def render_dashboard(self, summary):
+        self.empty_label.pack_forget()
+        if not self.content.winfo_manager():
+            self.content.pack(fill="both", expand=True)
+
+        # 1. KPI SECTION
         # Time Formatting
-        total_mins_raw = data['Actual_Mins'].sum()
+        total_mins_raw = summary["total_mins"]
         h = int(total_mins_raw // 60)
         m = int(total_mins_raw % 60)
         time_display = f"{h}h {m}min" if h > 0 else f"{m}min"
         
         # Focus Score Formatting
-        avg_focus = data['Focus_Level'].mean()
+        avg_focus = summary["avg_focus"]
         focus_display = f"{avg_focus:.1f} / 5"
-        
-        # Updated Stats: Both use #FFFFFF (Pure White)
-        stats_data = [
-            ("TOTAL TIME", time_display, "#FFFFFF"), 
-            ("AVG FOCUS", focus_display, "#FFFFFF")
-        ]
 
-        for label, val, color in stats_data:
-            card = ctk.CTkFrame(kpi_frame, fg_color="#1E1E1E", corner_radius=12, width=240, height=80)
-            card.pack(side="left", expand=True, padx=5)
-            card.pack_propagate(False)
-            ctk.CTkLabel(card, text=label, font=("Helvetica", 10, "bold"), text_color="#AAAAAA").pack(pady=(15, 2))
-            ctk.CTkLabel(card, text=val, font=("Helvetica", 18, "bold"), text_color=color).pack()
+        self.set_label(self.kpi_values["TOTAL TIME"], text=time_display)
+        self.set_label(self.kpi_values["AVG FOCUS"], text=focus_display)
 
         # 2. CATEGORY CHART
-        ctk.CTkLabel(self.container, text="TIME DISTRIBUTION", font=("Helvetica", 11, "bold"), 
-                     text_color="#AAAAAA").pack(anchor="w", padx=5, pady=(10, 5))
-        self.draw_native_donut(data)
+        self.draw_native_donut(summary["categories"])
 
-        # 3. HOURLY CHART
-        ctk.CTkLabel(self.container, text="FOCUS BY HOUR", font=("Helvetica", 11, "bold"), 
-                     text_color="#AAAAAA").pack(anchor="w", padx=5, pady=(20, 5))
-        self.draw_native_bars(data)
+        # 3. HOURLY CHART or 4. HEATMAP
+        if "heat_focus" in summary:
+            self.hour_section.pack_forget()
+            if not self.heat_section.winfo_manager():
+                self.heat_section.pack(fill="x")
+            self.draw_heatmap(summary["heat_minutes"], summary["heat_focus"])
+        else:
+            self.heat_section.pack_forget()
+            if not self.hour_section.winfo_manager():
+                self.hour_section.pack(fill="x")
+            self.draw_native_bars(summary["bins"])
 
-    def draw_native_donut(self, data):
-        cat_data = data.groupby('Category')['Actual_Mins'].sum()
-        total = cat_data.sum()
-        colors = ['#3a7ebf', '#16a085', '#f1c40f', '#e67e22', '#9b59b6']
-        
-        chart_container = ctk.CTkFrame(self.container, fg_color="#1E1E1E", corner_radius=12)
-        chart_container.pack(fill="x", pady=5)
+    @metrics.timed("dashboard.render_results")
+    def render_results(self, rows):
+        query = self.search_entry.get().strip()
+        if not query:
+            count = "Type to search every session's task and notes"
+        else:
+            count = f"{len(rows)} sessions" if rows else "No matching sessions"
+        self.set_label(self.results_count, text=count)
 
-        canvas = tk.Canvas(chart_container, width=150, height=150, bg="#1E1E1E", highlightthickness=0)
-        canvas.pack(side="left", padx=20, pady=15)
+        while len(self.result_rows) < len(rows):
+            label = ctk.CTkLabel(self.results_frame, text="", font=("Helvetica", 12), text_color="#DDDDDD",
+                                 anchor="w", justify="left", wraplength=440)
+            self.result_rows.append(label)
+        for label, (end, _, category, task, _, actual, _, notes, focus, _) in zip(self.result_rows, rows):
+            text = f"{end[:16]}  [{category}] {task} · {actual or 0:g}m"
+            if focus:
+                text += f" · focus {focus}"
+            if notes:
+                text += f"\n{notes}"
+            self.set_label(label, text=text)
+            if not label.winfo_manager():
+                label.pack(anchor="w", fill="x", padx=10, pady=3)
+        for label in self.result_rows[len(rows):]:
+            label.pack_forget()
+
+    def draw_native_donut(self, cat_data):
+        total = cat_data.sum()
 
-        legend_frame = ctk.CTkFrame(chart_container, fg_color="transparent")
-        legend_frame.pack(side="left", fill="y", pady=15)
+        # Grow the pools of arcs and legend rows as needed; never shrink them
+        while len(self.donut_arcs) < len(cat_data):
+            self.donut_arcs.append(self.donut.create_arc((5, 5, 145, 145), start=90, extent=0,
+                                                         outline="#1E1E1E", width=2))
+            self.donut.tag_raise(self.donut_hole)
+        while len(self.legend_rows) < len(cat_data):
+            row = ctk.CTkFrame(self.legend_frame, fg_color="transparent")
+            swatch = ctk.CTkFrame(row, width=8, height=8, corner_radius=4)
+            swatch.pack(side="left", padx=(0, 8))
+            name = ctk.CTkLabel(row, text="", font=("Helvetica", 11), text_color="#DDDDDD")
+            name.pack(side="left")
+            self.legend_rows.append((row, swatch, name))
 
         start_angle = 90
         for i, (cat, val) in enumerate(cat_data.items()):
             extent = (val / total) * 360
-            color = colors[i % len(colors)]
-            canvas.create_arc((5, 5, 145, 145), start=start_angle, extent=extent, fill=color, outline="#1E1E1E", width=2)
-            
-            row = ctk.CTkFrame(legend_frame, fg_color="transparent")
-            row.pack(anchor="w", pady=1)
-            ctk.CTkFrame(row, width=8, height=8, fg_color=color, corner_radius=4).pack(side="left", padx=(0, 8))
-            ctk.CTkLabel(row, text=cat, font=("Helvetica", 11), text_color="#DDDDDD").pack(side="left")
+            color = self.colors[i % len(self.colors)]
+            self.update_item(self.donut, self.donut_arcs[i], start=round(start_angle, 2),
+                             extent=round(extent, 2), fill=color, state="normal")
+
+            row, swatch, name = self.legend_rows[i]
+            if not row.winfo_manager():
+                row.pack(anchor="w", pady=1)
+            self.set_label(swatch, fg_color=color)
+            self.set_label(name, text=cat)
             start_angle += extent
-        canvas.create_oval((50, 50, 100, 100), fill="#1E1E1E", outline="#1E1E1E")
-
-    def draw_native_bars(self, data):
-        df = data.copy()
-        df['End_TS'] = pd.to_datetime(df['Date'])
-        df['Start_TS'] = df.apply(lambda row: row['End_TS'] - timedelta(minutes=row['Actual_Mins']), axis=1)
-        min_hour, max_hour = int(df['Start_TS'].min().hour), int(df['End_TS'].max().hour)
-        full_range = list(range(min_hour, max_hour + 1))
-
-        hourly_val = {}
-        for hour in full_range:
-            h_start = datetime.combine(df['Start_TS'].min().date(), datetime.min.time()).replace(hour=hour)
-            h_end = h_start + timedelta(hours=1)
-            points, mins = 0, 0
-            for _, s in df.iterrows():
-                o_start, o_end = max(s['Start_TS'], h_start), min(s['End_TS'], h_end)
-                if o_start < o_end:
-                    d = (o_end - o_start).total_seconds() / 60
-                    points += (s['Focus_Level'] * d)
-                    mins += d
-            if mins > 0: hourly_val[hour] = points / mins
-
-        chart_bg = ctk.CTkFrame(self.container, fg_color="#1E1E1E", corner_radius=12)
-        chart_bg.pack(fill="x", pady=5)
-        
-        c_w, c_h = 480, 200
-        px, py = 40, 30
-        canvas = tk.Canvas(chart_bg, width=c_w, height=c_h, bg="#1E1E1E", highlightthickness=0)
-        canvas.pack(pady=(15, 5))
 
-        for i in range(1, 6):
-            y = (c_h - py) - (i * ((c_h - 2*py) / 5))
-            canvas.create_line(px, y, c_w - px, y, fill="#2A2A2A", dash=(2, 2))
-            canvas.create_text(px - 15, y, text=str(i), fill="#666666", font=("Helvetica", 9))
+        for arc in self.donut_arcs[len(cat_data):]:
+            self.update_item(self.donut, arc, state="hidden")
+        for row, _, _ in self.legend_rows[len(cat_data):]:
+            row.pack_forget()
+
+    def draw_native_bars(self, bins):
+        full_range = list(bins.index)
+        # Bins with only unrated sessions have no focus (NaN) and get no bar
+        hourly_val = {ts: val for ts, val, mins in zip(bins.index, bins['Focus'], bins['Active_Mins'])
+                      if mins > 0 and not math.isnan(val)}
+
+        c_w, c_h, px, py = self.c_w, self.c_h, self.px, self.py
+        canvas = self.bars
+        while len(self.bar_slots) < len(full_range):
+            self.bar_slots.append((
+                canvas.create_text(0, 0, text="", fill="#666666", font=("Helvetica", 8)),
+                canvas.create_rectangle(0, 0, 0, 0, fill="#3a7ebf", outline=""),
+                canvas.create_text(0, 0, text="", fill="#FFFFFF", font=("Helvetica", 9, "bold")),
+            ))
 
         num = len(full_range)
-        gap = 12
-        bw = ((c_w - 2*px) - (num * gap)) / num
+        slot_w = (c_w - 2*px) / max(num, 1)
+        gap = min(12, slot_w * 0.3)
+        bw = slot_w - gap
+        # Bins can cover several days (sessions past midnight): thin out labels
+        # to what fits, and name the day at each midnight
+        label_every = max(1, math.ceil(num * 28 / (c_w - 2*px)))
+        day_fmt = "%a" if num and full_range[0].date() != full_range[-1].date() else None
+        show_values = bw >= 18
         for i, h in enumerate(full_range):
+            label, rect, value = self.bar_slots[i]
             x0 = px + (i * (bw + gap))
             x1 = x0 + bw
             y_base = c_h - py
-            canvas.create_text((x0+x1)/2, y_base + 15, text=f"{h}h", fill="#666666", font=("Helvetica", 8))
+            text = bin_label(h, self.bin_minutes, day_fmt=day_fmt) if i % label_every == 0 else ""
+            self.update_item(canvas, label, ((x0+x1)/2, y_base + 15), text=text, state="normal")
             if h in hourly_val:
                 val = hourly_val[h]
                 hp = (val / 5) * (c_h - 2 * py)
-                canvas.create_rectangle(x0, y_base - hp, x1, y_base, fill="#3a7ebf", outline="")
-                canvas.create_text((x0+x1)/2, y_base - hp - 10, text=f"{val:.1f}", fill="#FFFFFF", font=("Helvetica", 9, "bold"))
+                self.update_item(canvas, rect, (x0, y_base - hp, x1, y_base), state="normal")
+                self.update_item(canvas, value, ((x0+x1)/2, y_base - hp - 10), text=f"{val:.1f}",
+                                 state="normal" if show_values else "hidden")
+            else:
+                self.update_item(canvas, rect, state="hidden")
+                self.update_item(canvas, value, state="hidden")
 
-        legend = ctk.CTkFrame(chart_bg, fg_color="transparent")
-        legend.pack(pady=(0, 10))
-        ctk.CTkFrame(legend, width=10, height=10, fg_color="#3a7ebf", corner_radius=2).pack(side="left", padx=5)
-        ctk.CTkLabel(legend, text="Focus Quality (1-5)", font=("Helvetica", 10), text_color="#888888").pack(side="left")
+        for slot in self.bar_slots[num:]:
+            for item in slot:
+                self.update_item(canvas, item, state="hidden")
+
+    def draw_heatmap(self, minutes, focus):
+        # Cell color: focus quality (1-5) blended from the card background to the bar blue
+        for d in range(7):
+            for h in range(24):
+                if minutes[d, h] > 0 and focus[d, h] == focus[d, h]:
+                    color = heat_color(focus[d, h])
+                else:
+                    color = "#262626"
+                self.update_item(self.heat, self.heat_cells[d][h], fill=color)
+
+def heat_color(value, low=(0x26, 0x26, 0x26), high=(0x3a, 0x7e, 0xbf)):
+    t = min(max((value - 1) / 4, 0.0), 1.0) * 0.8 + 0.2
+    return "#%02x%02x%02x" % tuple(int(lo + (hi - lo) * t) for lo, hi in zip(low, high))
 
 if __name__ == "__main__":
     root = ctk.CTk()
@@ -0,0 +1,74 @@
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Advisory locks shared by every FlowClock process (GUI, CLI, scripts) that
+# appends to the same file. Advisory means only writers that take the lock are
+# serialized, so every append goes through here.
+
+@contextmanager
+def locked(f):
+    # Exclusive lock on an open file for the duration of the with block;
+    # blocks until whoever holds it is done
+    fd = f.fileno()
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            yield f
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        return
+    # msvcrt locks a byte range from the current position; byte 0 stands for the file
+    pos = os.lseek(fd, 0, os.SEEK_CUR)
+    os.lseek(fd, 0, os.SEEK_SET)
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            break
+        except OSError:
+            pass  # LK_LOCK gives up after ~10 s; keep waiting
+    os.lseek(fd, pos, os.SEEK_SET)
+    try:
+        yield f
+    finally:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        os.lseek(fd, pos, os.SEEK_SET)
+
+def replaced(f, path):
+    # True if path no longer names the file f has open: it was replaced (e.g.
+    # rotated) while we waited for the lock, and the caller should reopen path
+    st, current = os.fstat(f.fileno()), os.stat(path)
+    return (st.st_dev, st.st_ino) != (current.st_dev, current.st_ino)
+
+def append_locked(f, data, header=None, path=None):
+    # One append of data (bytes) to f, opened "a+b", under the lock.
+    # Returns the offset data was written at, or None (nothing written) if
+    # path was replaced while we waited (see replaced()).
+    with locked(f):
+        if path is not None and replaced(f, path):
+            return None
+        return append(f, data, header)
+
+def append(f, data, header=None):
+    # The append itself, for callers already holding f's lock.
+    # header (bytes) is written first if the file is still empty, so two
+    # processes creating the file at once can't both write a header. A row
+    # left unterminated by a writer that crashed mid-append gets its line
+    # ended first, so it stays a single bad row instead of swallowing ours.
+    size = f.seek(0, os.SEEK_END)
+    prefix = b""
+    if size == 0:
+        prefix = header or b""
+    else:
+        f.seek(size - 1)
+        if f.read(1) != b"\n":
+            prefix = b"\n"
+    f.write(prefix + data)
+    f.flush()
+    return f.tell() - len(data)
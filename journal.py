@@ -0,0 +1,120 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+
+JOURNAL_FILE = "flowclock.journal"
+# Running time between checkpoints: the most a crash can lose
+CHECKPOINT_SECS = 30
+
+class SessionJournal:
+    # Write-ahead journal of the session in progress, so a crash or a killed
+    # process doesn't lose it. One JSON record per line, append-only:
+    #   {"event": "begin", "wall": ..., "elapsed": 0, "category": ..., "task": ..., "est_mins": ...}
+    #   {"event": "running"|"paused"|"alarm"|"overtime"|"review"|"checkpoint", "wall": ..., "elapsed": ...}
+    # end() deletes the file once the session is logged or discarded, so a
+    # journal found at launch always belongs to an orphaned session (see recover()).
+    # Callers only enqueue; a worker thread does the writing and fsyncing, so
+    # the tick loop never waits on the disk.
+
+    def __init__(self, path=JOURNAL_FILE, interval=CHECKPOINT_SECS):
+        self.path = path
+        self.interval = interval
+        self._queue = queue.Queue()
+        self._thread = None
+        self._last_checkpoint = None
+        # end() must reach the disk before exit, or the next launch would offer
+        # to recover a session that was already logged
+        atexit.register(self.close)
+
+    def begin(self, category, task, est_mins, elapsed=0.0, started_at=None, **fields):
+        # A new journal replaces whatever was there
+        self._last_checkpoint = elapsed
+        self._put("begin", {"event": "begin", "wall": time.time(), "elapsed": elapsed,
+                            "started_at": started_at or time.time(), "category": category,
+                            "task": task, "est_mins": est_mins, **fields})
+
+    def record(self, event, elapsed):
+        self._last_checkpoint = elapsed
+        self._put("append", {"event": event, "wall": time.time(), "elapsed": round(elapsed, 3)})
+
+    def checkpoint(self, elapsed):
+        # Cheap to call every tick: only every interval seconds of running time is written
+        if self._last_checkpoint is None or elapsed - self._last_checkpoint < self.interval:
+            return
+        self.record("checkpoint", elapsed)
+
+    def end(self):
+        self._last_checkpoint = None
+        self._put("end", None)
+
+    def close(self, timeout=2.0):
+        # Waits for queued records to reach the disk (e.g. before exiting)
+        if self._thread is not None:
+            self._queue.put(("stop", None))
+            self._thread.join(timeout)
+            self._thread = None
+
+    # --- INTERNALS ---
+    def _put(self, op, record):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="journal", daemon=True)
+            self._thread.start()
+        self._queue.put((op, record))
+
+    def _run(self):
+        f, active = None, False
+        while True:
+            op, record = self._queue.get()
+            try:
+                if op in ("begin", "end", "stop") and f is not None:
+                    f.close()
+                    f = None
+                if op == "stop":
+                    return
+                if op == "end":
+                    active = False
+                    if os.path.exists(self.path):
+                        os.remove(self.path)
+                    continue
+                if op == "begin":
+                    active = True
+                elif not active:
+                    continue  # no session to append to
+                if f is None:
+                    f = open(self.path, "w" if op == "begin" else "a")
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            except OSError:
+                # A journal that can't be written must never take the timer down with it
+                f = None
+
+def recover(path=JOURNAL_FILE):
+    # The orphaned session left in the journal, or None. Time run after the last
+    # record is lost (at most one checkpoint interval); a torn last line is ignored.
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return None
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            break
+    if not records or records[0].get("event") != "begin":
+        return None
+    session = dict(records[0])
+    session["elapsed"] = max(r.get("elapsed", 0.0) for r in records)
+    session["overtime"] = any(r["event"] == "overtime" for r in records)
+    session["state"] = records[-1]["event"]
+    session["last_wall"] = records[-1]["wall"]
+    return session
+
+def discard(path=JOURNAL_FILE):
+    if os.path.exists(path):
+        os.remove(path)
@@ -1,19 +1,172 @@
+import atexit
 import csv
 from datetime import datetime
+import io
 import os
+import threading
+from file_lock import locked, replaced, append, append_locked
+from partitions import rotation_due, rotate
+import metrics
+from session_store import SessionStore, LOG_FILE, COLUMNS, SCHEMA_VERSION, header_version, session_row
 
-def log_session(category, task, est_mins, actual_mins, completed, notes, focus_level):
-    file_name = "focus_sessions.csv"
-    # Added Focus_Level to headers
-    headers = ["Date", "Category", "Task", "Est_Mins", "Actual_Mins", "Completed", "Notes", "Focus_Level"]
-    
-    date_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    file_exists = os.path.isfile(file_name)
-    
-    with open(file_name, "a", newline="") as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(headers)
-        
-        # Added focus_level to the data row
-        writer.writerow([date_str, category, task, est_mins, actual_mins, completed, notes, focus_level])
\ No newline at end of file
+# GUI and CLI both log here, in the version 2 format (see session_store)
+FILE_NAME = LOG_FILE
+HEADERS = COLUMNS
+
+class SessionWriter:
+    # Keeps the CSV handle (and the store connection) open and buffers rows.
+    # The buffer is written out once it holds max_rows rows, max_delay seconds
+    # after the first buffered row, on flush()/close(), or at interpreter exit.
+    # durability="flush" hands rows to the OS; "fsync" also forces them to disk.
+    # Several processes (GUI, CLI) may log at once: each buffer goes out as one
+    # append under an advisory lock on the log (see file_lock), so rows never
+    # interleave. The store insert happens under the same lock, which the store's
+    # first-run import also holds, so no row is ever imported and inserted both.
+    # listeners are called as listener(offset, data) with the bytes each append
+    # wrote and where, so in-process readers can skip reading them back.
+
+    def __init__(self, file_name=FILE_NAME, max_rows=50, max_delay=2.0, durability="flush", use_store=True,
+                 listeners=None):
+        if durability not in ("flush", "fsync"):
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.file_name = file_name
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.durability = durability
+        self.closed = False
+        self.listeners = listeners if listeners is not None else []
+
+        # Earlier months move out to their partitions first (see partitions)
+        if rotation_due(file_name):
+            rotate(file_name)
+        self._month = datetime.now().strftime("%Y-%m")
+
+        # Never append version 2 rows under an old header
+        if os.path.isfile(file_name) and os.path.getsize(file_name) > 0:
+            with open(file_name, newline="") as f:
+                version = header_version(next(csv.reader(f), None))
+            if version != SCHEMA_VERSION:
+                raise ValueError(f"{file_name} is a version {version} log; run: python session_store.py migrate")
+
+        # Store first: a brand-new store imports the CSV history on creation
+        self.store = SessionStore() if use_store else None
+        if self.store:
+            sync = "FULL" if durability == "fsync" else "NORMAL"
+            self.store.conn.execute(f"PRAGMA synchronous={sync}")
+
+        self._file = open(file_name, "a+b")
+        self._header = self._encode([HEADERS])
+        # Writes the header if the file is new, whoever else is creating it
+        append_locked(self._file, b"", self._header)
+        self._sync()
+
+        self._buffer = []
+        self._lock = threading.RLock()
+        self._timer = None
+        atexit.register(self.close)
+
+    def write(self, row):
+        with self._lock:
+            if self.closed:
+                raise ValueError("SessionWriter is closed")
+            self._buffer.append(list(row))
+            if len(self._buffer) >= self.max_rows:
+                self._flush_locked()
+            elif self._timer is None and self.max_delay:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def write_session(self, category, task, est_mins, actual_mins, completed, notes, focus_level,
+                      source="gui", started_at=None):
+        # started_at: when the session first started (datetime); ends now
+        self.write(session_row(datetime.now(), started_at, category, task, est_mins, actual_mins,
+                               completed, notes, focus_level, source))
+
+    def flush(self):
+        with self._lock:
+            if not self.closed:
+                self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self._flush_locked()
+            self.closed = True
+            self._file.close()
+            if self.store:
+                self.store.close()
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        with metrics.span("log.flush"):
+            self._write_rows(rows)
+        metrics.count("log.rows", len(rows))
+
+    def _write_rows(self, rows):
+        month = datetime.now().strftime("%Y-%m")
+        if month != self._month:
+            # Still running when the month turned: rotate before the first row of the new one
+            self._month = month
+            rotate(self.file_name)
+        data = self._encode(rows)
+        while True:
+            with locked(self._file):
+                if not replaced(self._file, self.file_name):
+                    if self.store:
+                        with metrics.span("log.store"):
+                            self.store.append_many(rows)
+                    with metrics.span("log.csv"):
+                        offset = append(self._file, data, self._header)
+                        self._sync()
+                    break
+            # The log was replaced by a rotation: carry on in the new live file
+            self._file.close()
+            self._file = open(self.file_name, "a+b")
+        for listener in self.listeners:
+            listener(offset, data)
+
+    def _encode(self, rows):
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        return buf.getvalue().encode("utf-8")
+
+    def _sync(self):
+        self._file.flush()
+        if self.durability == "fsync":
+            os.fsync(self._file.fileno())
+
+_default_writer = None
+_listeners = []
+
+def get_writer():
+    global _default_writer
+    if _default_writer is None or _default_writer.closed:
+        _default_writer = SessionWriter(listeners=_listeners)
+    return _default_writer
+
+def add_listener(callback):
+    # Called with every append the shared writer makes, now and after it is reopened
+    _listeners.append(callback)
+
+@metrics.timed("log.session")
+def log_session(category, task, est_mins, actual_mins, completed, notes, focus_level,
+                source="gui", started_at=None):
+    # One row, on disk before returning so the dashboard sees it
+    writer = get_writer()
+    writer.write_session(category, task, est_mins, actual_mins, completed, notes, focus_level,
+                         source, started_at)
+    writer.flush()
@@ -0,0 +1,157 @@
+import atexit
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Counters and latency histograms for the hot paths (ticks, logging, dashboard
+# loads, audio), plus a trace of recent spans for chrome://tracing / Perfetto.
+# Off unless FLOWCLOCK_METRICS is set or enable() is called; while off, every
+# call below is a single flag check, so instrumentation can stay in hot code.
+#   FLOWCLOCK_METRICS=1 python timer.py
+#   FLOWCLOCK_TRACE=trace.json python timer.py     # also writes the trace at exit
+TRACE_FILE = os.environ.get("FLOWCLOCK_TRACE")
+ENABLED = bool(os.environ.get("FLOWCLOCK_METRICS") or TRACE_FILE)
+# Histogram bucket upper bounds (ms); values above the last go in an overflow bucket
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+# Spans kept for the trace; older ones are dropped
+TRACE_LIMIT = 100000
+
+class Histogram:
+    # Fixed buckets: O(1) memory per metric, percentiles to bucket precision
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+
+    def percentile(self, q):
+        # Upper bound of the bucket holding the q-th value, capped at the largest seen
+        if not self.count:
+            return None
+        rank, seen = q / 100 * self.count, 0
+        for bound, n in zip(BUCKETS_MS + [self.max], self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {"count": self.count, "mean": self.total / self.count if self.count else None,
+                "min": self.min, "max": self.max, "p50": self.percentile(50),
+                "p95": self.percentile(95), "p99": self.percentile(99)}
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_events = deque(maxlen=TRACE_LIMIT)
+_origin = time.perf_counter()
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _events.clear()
+
+# --- RECORDING ---
+def count(name, n=1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+def observe(name, ms):
+    if not ENABLED:
+        return
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.add(ms)
+
+class _Span:
+    __slots__ = ("name", "began")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.began = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ended = time.perf_counter()
+        observe(self.name, (ended - self.began) * 1000)
+        _events.append((self.name, self.began, ended, threading.get_ident()))
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+_NO_SPAN = _NoSpan()
+
+def span(name):
+    # with span("log.flush"): ...  -> a histogram of its duration and a trace event
+    return _Span(name) if ENABLED else _NO_SPAN
+
+def timed(name):
+    # Decorator form of span()
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with _Span(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+# --- READING ---
+def snapshot():
+    with _lock:
+        return {"counters": dict(_counters),
+                "histograms": {name: h.summary() for name, h in sorted(_histograms.items())}}
+
+def export_json(path):
+    with open(path, "w") as f:
+        json.dump({"when": time.strftime("%Y-%m-%d %H:%M:%S"), "pid": os.getpid(), **snapshot()}, f, indent=1)
+
+def export_trace(path):
+    # Chrome trace event format: one complete ("X") event per span, times in µs
+    pid = os.getpid()
+    with _lock:
+        events = list(_events)
+        counters = dict(_counters)
+    trace = [{"name": name, "ph": "X", "pid": pid, "tid": tid, "ts": round((began - _origin) * 1e6, 1),
+              "dur": round((ended - began) * 1e6, 1)} for name, began, ended, tid in events]
+    last = max((e[2] for e in events), default=time.perf_counter())
+    trace += [{"name": name, "ph": "C", "pid": pid, "ts": round((last - _origin) * 1e6, 1), "args": {"value": n}}
+              for name, n in counters.items()]
+    with open(path, "w") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+def _export_at_exit():
+    if TRACE_FILE and ENABLED:
+        export_trace(TRACE_FILE)
+
+atexit.register(_export_at_exit)
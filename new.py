@@ -1,7 +1,10 @@
 import customtkinter as ctk
+from datetime import datetime
 from logger import log_session
-from audio_player import play_alarm, stop_alarm
+from audio_player import play_alarm, stop_alarm, preload as preload_audio
 import tkinter as tk
+from ticker import Ticker
+from timer_engine import TimerEngine, IDLE, ALARM
 
 class FlowClock(ctk.CTk):
     def __init__(self):
@@ -11,11 +14,12 @@ class FlowClock(ctk.CTk):
         self.geometry("450x800")
         ctk.set_appearance_mode("dark")
         
-        self.remaining_seconds = 0
-        self.total_initial_seconds = 0
-        self.elapsed_seconds = 0
-        self.is_running = False
-        self.mode = "countdown"
+        # Timing and state transitions live in TimerEngine; this window renders its events
+        self.engine = TimerEngine()
+        self.ticker = Ticker(self.after, self.after_cancel, lambda elapsed: self.engine.tick(), clock=self.engine.clock)
+        self.engine.on("state", self.on_state_change)
+        self.engine.on("tick", self.update_clock)
+        self.engine.on("alarm", self.trigger_alarm_state)
         
         self.setup_ui()
 
@@ -89,74 +93,68 @@ class FlowClock(ctk.CTk):
             self.after(1000, lambda: self.status_label.configure(text="Ready to Focus", text_color="white"))
 
     def start_countdown(self):
-        if not self.is_running:
-            if self.remaining_seconds == 0:
-                self.remaining_seconds = int(self.est_entry.get()) * 60
-                self.total_initial_seconds = self.remaining_seconds
-            self.is_running = True
-            self.update_clock()
+        if self.engine.state == IDLE:
+            self.engine.start(int(self.est_entry.get()))
+            preload_audio()
 
     def toggle_pause(self):
         try: stop_alarm()
         except: pass
-        if self.mode == "stopwatch" and not self.is_running:
-            self.is_running = True
+        if self.engine.state == ALARM:
+            self.engine.keep_going()
             self.pause_btn.configure(text="Pause", fg_color="orange")
-            self.update_clock()
             return
-        if self.is_running:
-            self.is_running = False
+        if self.engine.running:
+            self.engine.pause()
             self.pause_btn.configure(text="Resume", fg_color="#2ecc71")
         else:
-            self.is_running = True
+            self.engine.resume()
             self.pause_btn.configure(text="Pause", fg_color="orange")
-            self.update_clock()
-
-    def update_clock(self):
-        if not self.is_running: return
-        if self.mode == "countdown":
-            if self.remaining_seconds > 0:
-                self.remaining_seconds -= 1
-                self.display_time(self.remaining_seconds)
-                extent = (self.remaining_seconds / self.total_initial_seconds) * 360
-                self.canvas.itemconfig(self.progress_arc, extent=extent)
-                self.after(1000, self.update_clock)
-            else:
-                self.trigger_alarm_state()
-        elif self.mode == "stopwatch":
-            self.elapsed_seconds += 1
-            self.display_time(self.elapsed_seconds)
+
+    def on_state_change(self, old, new):
+        if self.engine.running: self.ticker.run()
+        else: self.ticker.stop()
+
+    def update_clock(self, seconds):
+        if self.engine.phase == "countdown":
+            self.display_time(seconds)
+            extent = (seconds / self.engine.total_seconds) * 360 if self.engine.total_seconds else 0
+            self.canvas.itemconfig(self.progress_arc, extent=extent)
+        else:
+            self.display_time(seconds)
             self.canvas.itemconfig(self.progress_arc, extent=359.9, outline="#16a085")
-            self.after(1000, self.update_clock)
 
     def display_time(self, total_seconds):
         mins, secs = divmod(total_seconds, 60)
         self.canvas.itemconfig(self.timer_text, text=f"{mins:02d}:{secs:02d}")
 
     def trigger_alarm_state(self):
-        self.is_running = False 
         play_alarm()
-        self.mode = "stopwatch"
         self.status_label.configure(text="Goal Reached!", text_color="#3498db")
         self.pause_btn.configure(text="Silence & Continue", fg_color="#3498db")
         self.canvas.itemconfig(self.timer_text, fill="#3498db")
 
     def initiate_review(self):
-        self.is_running = False
+        self.engine.finish()
         try: stop_alarm()
         except: pass
         self.timer_frame.pack_forget()
         self.review_frame.pack(fill="both", expand=True)
         self.status_label.configure(text="Session Review", text_color="#f1c40f")
 
+    def started_at(self):
+        # Wall time the first run of this session began
+        segments = self.engine.clock.segments
+        return datetime.fromtimestamp(segments[0][0]) if segments else None
+
     def finalize_data(self, focus_score):
         # Calculation
         est_mins = int(self.est_entry.get())
-        actual_mins = round(est_mins + (self.elapsed_seconds / 60), 2)
+        actual_mins = round(self.engine.actual_seconds() / 60, 2)
         task_name = self.task_entry.get() or "Unnamed Task"
         
         # Log to CSV
-        log_session(self.category_var.get(), task_name, est_mins, actual_mins, "Yes", self.notes_text.get("1.0", "end-1c"), focus_score)
+        log_session(self.category_var.get(), task_name, est_mins, actual_mins, "Yes", self.notes_text.get("1.0", "end-1c"), focus_score, started_at=self.started_at())
         
         # Show Success Screen
         self.review_frame.pack_forget()
@@ -167,10 +165,7 @@ class FlowClock(ctk.CTk):
         self.success_label.configure(text=summary)
 
     def reset_timer(self):
-        self.is_running = False
-        self.remaining_seconds = 0
-        self.elapsed_seconds = 0
-        self.mode = "countdown"
+        self.engine.reset()
         self.success_frame.pack_forget()
         self.input_frame.pack(fill="both", expand=True)
         self.canvas.itemconfig(self.progress_arc, extent=0, outline="#3a7ebf")
@@ -0,0 +1,173 @@
+import csv
+import gzip
+import heapq
+import json
+import math
+import os
+import re
+import sys
+from datetime import datetime
+from file_lock import locked
+from session_store import LOG_FILE, COLUMNS, DATE_FMT, SCHEMA_VERSION, header_version
+
+# --- MONTHLY PARTITIONS ---
+# The live log (sessions.csv) only holds the current month and stays a plain,
+# appendable CSV. Earlier months are rotated out into one gzipped partition per
+# month next to it, archive/sessions-YYYY-MM.csv.gz (same header and columns),
+# and archive/manifest.json records each partition's first and last End and its
+# row count, so readers pick the partitions a range needs without opening any:
+#   {"partitions": [{"month": "2025-11", "file": "sessions-2025-11.csv.gz",
+#                    "first": "2025-11-01 08:12:40", "last": "2025-11-30 22:03:11", "rows": 212}]}
+ARCHIVE_DIR = "archive"
+MANIFEST_FILE = "manifest.json"
+MONTH = re.compile(r"\d{4}-\d{2}")
+
+def archive_dir(log_path=LOG_FILE):
+    return os.path.join(os.path.dirname(os.path.abspath(log_path)), ARCHIVE_DIR)
+
+def load_manifest(log_path=LOG_FILE):
+    try:
+        with open(os.path.join(archive_dir(log_path), MANIFEST_FILE)) as f:
+            return json.load(f)["partitions"]
+    except FileNotFoundError:
+        return []
+
+def save_manifest(partitions, log_path=LOG_FILE):
+    path = os.path.join(archive_dir(log_path), MANIFEST_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"partitions": sorted(partitions, key=lambda p: p["month"])}, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+def partition_paths(start=None, end=None, log_path=LOG_FILE):
+    # Files holding sessions that end in [start, end) (datetimes; None = unbounded),
+    # oldest first: the archived months that overlap, then the live log
+    first = start.strftime(DATE_FMT) if start else None
+    last = end.strftime(DATE_FMT) if end else None
+    paths = [os.path.join(archive_dir(log_path), p["file"]) for p in load_manifest(log_path)
+             if (first is None or p["last"] >= first) and (last is None or p["first"] < last)]
+    if os.path.isfile(log_path):
+        paths.append(log_path)
+    return paths
+
+def rotation_due(log_path=LOG_FILE, now=None):
+    # Cheap check (header and first row only): does the live log start before this month?
+    current = (now or datetime.now()).strftime("%Y-%m")
+    try:
+        with open(log_path, newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            row = next(reader, None)
+    except FileNotFoundError:
+        return False
+    return bool(row) and MONTH.match(row[0]) is not None and row[0][:7] < current
+
+def rotate(log_path=LOG_FILE, now=None):
+    # Moves every month before the current one out of the live log into its
+    # partition. Loggers are held off by the log's lock while this runs and
+    # append to the new live log afterwards (see SessionWriter). Partitions and
+    # the manifest are in place before the live log is replaced, and a month
+    # that already has a partition is merged into it without duplicating rows,
+    # so an interrupted rotation is simply finished by the next one.
+    # Returns the months written.
+    if not rotation_due(log_path, now):
+        return []
+    current = (now or datetime.now()).strftime("%Y-%m")
+    out_dir = archive_dir(log_path)
+    os.makedirs(out_dir, exist_ok=True)
+    with open(log_path, "a+b") as lock, locked(lock):
+        if not rotation_due(log_path, now):
+            return []  # another process rotated it while we waited
+        with open(log_path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header_version(header) != SCHEMA_VERSION:
+                raise ValueError(f"{log_path} is not a version 2 log; run: python session_store.py migrate")
+            # Closed months to their partitions; the current month (and anything
+            # after it, if the clock was ever wrong) stays live
+            closed, live, month = {}, [], None
+            for row in reader:
+                if row and MONTH.match(row[0]):
+                    month = row[0][:7]
+                (closed.setdefault(month, []) if month and month < current else live).append(row)
+
+        manifest = {p["month"]: p for p in load_manifest(log_path)}
+        for month, rows in sorted(closed.items()):
+            entry = manifest.get(month) or {"month": month, "file": f"sessions-{month}.csv.gz"}
+            path = os.path.join(out_dir, entry["file"])
+            if os.path.isfile(path):
+                rows = merge_rows(read_partition(path), rows)
+            write_partition(path, rows)
+            ends = [r[0] for r in rows if r and MONTH.match(r[0])]
+            entry.update(first=min(ends, default=""), last=max(ends, default=""), rows=len(rows))
+            manifest[month] = entry
+        save_manifest(list(manifest.values()), log_path)
+
+        tmp_path = log_path + ".tmp"
+        with open(tmp_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(live)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, log_path)
+    return sorted(closed)
+
+def read_partition(path):
+    with gzip.open(path, "rt", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return list(reader)
+
+def write_partition(path, rows):
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+    with open(tmp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def merge_rows(old, new):
+    # Both in End order; a row already in old (an interrupted rotation) is dropped
+    seen = {tuple(r) for r in old}
+    return list(heapq.merge(old, [r for r in new if tuple(r) not in seen], key=lambda r: r[0] if r else ""))
+
+def main(argv):
+    # python partitions.py rotate
+    # python partitions.py list
+    # python partitions.py report 2025-11-01 2026-01-01    # sessions ending in [from, to)
+    if len(argv) < 2 or argv[1] not in ("rotate", "list", "report") or (argv[1] == "report" and len(argv) != 4):
+        print("Usage: python partitions.py rotate|list|report FROM TO")
+        return
+    if argv[1] == "rotate":
+        months = rotate()
+        print(f"✅ Archived {', '.join(months)}" if months else "Nothing to rotate")
+        return
+    if argv[1] == "report":
+        report(*argv[2:4])
+        return
+    for p in load_manifest():
+        print(f"{p['month']}  {p['rows']:>7} sessions  {p['first']} .. {p['last']}  {p['file']}")
+    if os.path.isfile(LOG_FILE):
+        print(f"live     {LOG_FILE}")
+
+def report(first, last):
+    # Range totals straight from the log, reading only the partitions the range needs
+    from aggregate import aggregate_log
+    try:
+        start, end = datetime.strptime(first, "%Y-%m-%d"), datetime.strptime(last, "%Y-%m-%d")
+    except ValueError:
+        print("❌ Error: dates must be YYYY-MM-DD")
+        return
+    summary = aggregate_log(start, end).summary()
+    focus = summary["avg_focus"]
+    print(f"{first} .. {last}: {summary['total_mins']:.0f} mins, "
+          f"avg focus {'-' if math.isnan(focus) else f'{focus:.2f}'}")
+    for category, mins in summary["categories"].items():
+        print(f"  {category:<10} {mins:>8.0f} mins")
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+# Materialized aggregates kept next to the sessions table and updated in the same
+# transaction as every insert, so reports read O(periods) rows instead of sessions.
+#   day          period "YYYY-MM-DD" (by session end), overall and per category
+#   week         period "YYYY-Www" (ISO week), overall and per category
+#   hour         period "YYYY-MM-DD HH", minutes split across the hours a session spans
+#   hour_of_day  period "HH", the same split folded over all days
+ALL = "*"
+FIELDS = ["minutes", "focus_minutes", "rated_minutes", "focus_sum", "rated_count",
+          "sessions", "est_error", "abs_est_error"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    grain TEXT NOT NULL,
+    period TEXT NOT NULL,
+    category TEXT NOT NULL,
+    minutes REAL DEFAULT 0,
+    focus_minutes REAL DEFAULT 0,
+    rated_minutes REAL DEFAULT 0,
+    focus_sum REAL DEFAULT 0,
+    rated_count INTEGER DEFAULT 0,
+    sessions INTEGER DEFAULT 0,
+    est_error REAL DEFAULT 0,
+    abs_est_error REAL DEFAULT 0,
+    PRIMARY KEY (grain, period, category)
+);
+"""
+
+UPSERT = (
+    f"INSERT INTO rollups (grain, period, category, {', '.join(FIELDS)}) "
+    f"VALUES ({', '.join('?' * (len(FIELDS) + 3))}) "
+    f"ON CONFLICT (grain, period, category) DO UPDATE SET "
+    + ", ".join(f"{f} = {f} + excluded.{f}" for f in FIELDS)
+)
+
+def contributions(date, category, est_mins, actual_mins, focus_level, date_fmt="%Y-%m-%d %H:%M:%S"):
+    # Yields ((grain, period, category), [FIELDS...]) for one session
+    end = datetime.strptime(date, date_fmt)
+    actual = actual_mins or 0.0
+    rated = focus_level is not None
+    error = actual - est_mins if est_mins is not None else 0.0
+    whole = [actual, focus_level * actual if rated else 0.0, actual if rated else 0.0,
+             focus_level if rated else 0.0, int(rated), 1, error, abs(error)]
+
+    iso = end.isocalendar()
+    day, week = end.strftime("%Y-%m-%d"), f"{iso[0]}-W{iso[1]:02d}"
+    for cat in (ALL, category or ""):
+        yield ("day", day, cat), whole
+        yield ("week", week, cat), whole
+
+    # Same overlap rule as the hourly charts: each hour gets the minutes it overlaps
+    t = end - timedelta(minutes=actual)
+    while t < end:
+        hour_end = min(t.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1), end)
+        mins = (hour_end - t).total_seconds() / 60
+        part = [mins, focus_level * mins if rated else 0.0, mins if rated else 0.0, 0.0, 0, 1, 0.0, 0.0]
+        yield ("hour", t.strftime("%Y-%m-%d %H"), ALL), part
+        yield ("hour_of_day", t.strftime("%H"), ALL), part
+        t = hour_end
+
+def accumulate(totals, records):
+    # records: iterables of (date, category, est_mins, actual_mins, focus_level)
+    for record in records:
+        for key, values in contributions(*record):
+            acc = totals.get(key)
+            if acc is None:
+                totals[key] = list(values)
+            else:
+                for i, v in enumerate(values):
+                    acc[i] += v
+    return totals
+
+def apply(conn, totals):
+    conn.executemany(UPSERT, [(*key, *values) for key, values in totals.items()])
+
+def focus_avg(row):
+    # Session-average focus, as Focus_Level.mean() over rated sessions
+    return row["focus_sum"] / row["rated_count"] if row["rated_count"] else float("nan")
+
+def weighted_focus(row):
+    # Duration-weighted focus, as the hourly charts compute it
+    return row["focus_minutes"] / row["rated_minutes"] if row["rated_minutes"] else float("nan")
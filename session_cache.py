@@ -0,0 +1,39 @@
+import threading
+from datetime import datetime
+from csv_tail import CsvTail
+from session_store import LOG_FILE, COLUMNS
+
+class TodaySessions:
+    # Today's sessions, kept in memory for the life of the app. The log is read
+    # once (from the end, see CsvTail); after that, rows this process logs are
+    # handed over by the writer as it appends them (appended() is a SessionWriter
+    # listener), so the dashboard gets them without going back to the disk.
+    # Rows other processes append are picked up from the file on the next read.
+    # Pandas-free, so the timer can own one without importing the dashboard.
+
+    def __init__(self, path=LOG_FILE):
+        self.path = path
+        self._tail = CsvTail(path)
+        # Loads run on worker threads and appends may come from the writer's flush timer
+        self._lock = threading.Lock()
+        # Derived values (e.g. the dashboard's summary) for the rows as they stand
+        self._memo = {}
+
+    def rows(self):
+        # (rows, header, version): version changes whenever the rows do
+        with self._lock:
+            rows = self._tail.read_day(datetime.now().date())
+            return rows, self._tail.header or COLUMNS, (self._tail.day, self._tail.offset)
+
+    def appended(self, offset, data):
+        with self._lock:
+            self._tail.feed(offset, data)
+
+    def memo(self, key, version, compute):
+        # compute() once per version of the rows; older results are dropped
+        hit = self._memo.get(key)
+        if hit is not None and hit[0] == version:
+            return hit[1]
+        value = compute()
+        self._memo[key] = (version, value)
+        return value
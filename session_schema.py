@@ -0,0 +1,119 @@
+import pandas as pd
+from session_store import COLUMNS, LOG_FILE
+from partitions import partition_paths
+
+# One typed shape for session frames, whatever they were read from (a version 2
+# log, a legacy version 1 log, or the store).
+#   End, Start            datetime64, from either format the loggers have written;
+#                         legacy rows start Actual_Mins before they end
+#   Category, Task,
+#   Completed             category (few distinct values repeated on every row)
+#   Est_Mins, Actual_Mins float32
+#   Focus_Level           Int8, 1-5 with <NA> for unrated sessions
+#   Source                category
+DATE_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"]
+NA_VALUES = ["", "N/A", "NA", "nan"]
+FOCUS_RANGE = (1, 5)
+
+# Numbers and dates are read as text and converted afterwards, so one bad value
+# marks one row as bad instead of failing (or silently object-typing) the column
+READ_DTYPES = {"End": "str", "Start": "str", "Date": "str", "Category": "category", "Task": "category",
+               "Est_Mins": "str", "Actual_Mins": "str", "Completed": "category", "Notes": "str",
+               "Focus_Level": "str", "Source": "category"}
+
+def parse_dates(values):
+    # Explicit formats only: each is tried on the rows the previous ones left unparsed
+    values = pd.Series(values).str.strip()
+    out = pd.to_datetime(values, format=DATE_FORMATS[0], errors="coerce")
+    for fmt in DATE_FORMATS[1:]:
+        todo = out.isna() & values.notna()
+        if not todo.any():
+            break
+        out[todo] = pd.to_datetime(values[todo], format=fmt, errors="coerce")
+    return out
+
+def _given(values):
+    return values.notna() & ~values.astype("str").str.strip().isin(NA_VALUES)
+
+def apply_schema(raw):
+    # Returns (typed frame, bad rows). Bad rows keep their raw values plus a Reason
+    # and are left out of the typed frame.
+    legacy = "End" not in raw.columns
+    date = parse_dates(raw["Date"] if legacy else raw["End"])
+    est = pd.to_numeric(raw["Est_Mins"], errors="coerce")
+    actual = pd.to_numeric(raw["Actual_Mins"], errors="coerce")
+    focus = pd.to_numeric(raw["Focus_Level"], errors="coerce")
+
+    reason = pd.Series(None, index=raw.index, dtype="object")
+    checks = [
+        (date.isna(), "bad date"),
+        (actual.isna() | (actual < 0), "bad Actual_Mins"),
+        (_given(raw["Focus_Level"]) & ~(focus.between(*FOCUS_RANGE) & (focus == focus.round())), "bad Focus_Level"),
+    ]
+    # Earlier checks win, so the first problem found is the one reported
+    for mask, text in reversed(checks):
+        reason[mask] = text
+    bad = reason.notna()
+
+    ok = ~bad
+    if legacy:
+        start = date - pd.to_timedelta(actual, unit="m")
+        source = pd.Series("", index=raw.index)
+    else:
+        # Store rows from before version 2 have no start either
+        start = parse_dates(raw["Start"]).fillna(date - pd.to_timedelta(actual, unit="m"))
+        source = raw["Source"]
+    df = pd.DataFrame({
+        "End": date[ok],
+        "Start": start[ok],
+        "Category": raw["Category"][ok].astype("category"),
+        "Task": raw["Task"][ok].astype("category"),
+        "Est_Mins": est[ok].astype("float32"),
+        "Actual_Mins": actual[ok].astype("float32"),
+        "Completed": raw["Completed"][ok].astype("category"),
+        "Notes": raw["Notes"][ok].astype("str"),
+        "Focus_Level": focus[ok].astype("Int8"),
+        "Source": source[ok].astype("category"),
+    })
+    return df, raw[bad].assign(Reason=reason[bad])
+
+def frame_from_rows(rows, columns=COLUMNS):
+    # Rows as csv.reader or the store return them
+    raw = pd.DataFrame.from_records(rows, columns=columns) if len(rows) else pd.DataFrame(columns=columns)
+    return apply_schema(raw)
+
+def iter_sessions(path, chunksize=50000):
+    # Streams (typed chunk, bad rows) pairs; the index is the 0-based data row number
+    for chunk in pd.read_csv(path, dtype=READ_DTYPES, na_values=NA_VALUES, keep_default_na=False,
+                             chunksize=chunksize):
+        yield apply_schema(chunk)
+
+def load_sessions(path):
+    # Plain or gzipped (an archived partition)
+    raw = pd.read_csv(path, dtype=READ_DTYPES, na_values=NA_VALUES, keep_default_na=False)
+    return apply_schema(raw)
+
+def load_range(start, end, log_path=LOG_FILE):
+    # Sessions ending in [start, end), opening only the partitions that overlap it
+    frames, bads = [], []
+    for path in partition_paths(start, end, log_path):
+        df, bad = load_sessions(path)
+        frames.append(df[(df["End"] >= start) & (df["End"] < end)])
+        bads.append(bad)
+    if not frames:
+        return apply_schema(pd.DataFrame(columns=COLUMNS))
+    if len(frames) > 1:
+        # Each file has its own categories: share them, or concat falls back to object
+        for name in frames[0].columns:
+            if isinstance(frames[0][name].dtype, pd.CategoricalDtype):
+                union = pd.api.types.union_categoricals([f[name] for f in frames]).categories
+                frames = [f.assign(**{name: f[name].cat.set_categories(union)}) for f in frames]
+    return pd.concat(frames, ignore_index=True), pd.concat(bads)
+
+def report_bad(bad, source, limit=5):
+    if bad.empty:
+        return
+    print(f"⚠️ Skipped {len(bad)} malformed row(s) in {source}:")
+    for index, row in bad.head(limit).iterrows():
+        # +2: header line and 1-based line numbers (exact unless notes span lines)
+        print(f"   line {index + 2}: {row['Reason']} ({row.iloc[0]!r})")
@@ -0,0 +1,349 @@
+import csv
+import gzip
+import heapq
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+import rollups
+import text_index
+from file_lock import locked, replaced
+
+DB_FILE = "flowclock.db"
+DATE_FMT = "%Y-%m-%d %H:%M:%S"
+
+# --- SESSION LOG FORMAT ---
+# Version 2: one log for every front end, each session with its start and end.
+# End comes first because rows are appended as sessions end, so the first
+# column is the file's sort key (CsvTail relies on that). Completed is Yes/No,
+# an unrated Focus_Level is empty, Source says which front end wrote the row.
+SCHEMA_VERSION = 2
+LOG_FILE = "sessions.csv"
+COLUMNS = ["End", "Start", "Category", "Task", "Est_Mins", "Actual_Mins", "Completed", "Notes",
+           "Focus_Level", "Source"]
+# Version 1: focus_sessions.csv (GUI, 8 columns) and work_log.csv (CLI, no Focus_Level),
+# end time only, Completed as Yes or True/False
+LEGACY_COLUMNS = ["Date", "Category", "Task", "Est_Mins", "Actual_Mins", "Completed", "Notes", "Focus_Level"]
+LEGACY_FILES = ["focus_sessions.csv", "work_log.csv"]
+
+# Columns of a version 2 row, as queries return them
+ROW_FIELDS = "date, start, category, task, est_mins, actual_mins, completed, notes, focus_level, source"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    start TEXT,
+    category TEXT,
+    task TEXT,
+    est_mins REAL,
+    actual_mins REAL,
+    completed TEXT,
+    notes TEXT,
+    focus_level INTEGER,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(date);
+CREATE TABLE IF NOT EXISTS imports (
+    path TEXT PRIMARY KEY,
+    rows INTEGER,
+    imported_at TEXT
+);
+"""
+
+def normalize_date(value):
+    # CSVs carry both "%Y-%m-%d %H:%M" and "%Y-%m-%d %H:%M:%S"; the store keeps one
+    # fixed-width format so plain string comparison on the index is chronological
+    for fmt in (DATE_FMT, "%Y-%m-%d %H:%M"):
+        try:
+            return datetime.strptime(value.strip(), fmt).strftime(DATE_FMT)
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date: {value!r}")
+
+def to_number(value, cast=float):
+    if value in (None, "", "N/A", "NA", "nan"):
+        return None
+    try:
+        return cast(float(value))
+    except (TypeError, ValueError):
+        return None
+
+def normalize_completed(value):
+    text = str(value).strip().lower()
+    if text in ("yes", "y", "true", "1"):
+        return "Yes"
+    if text in ("no", "n", "false", "0"):
+        return "No"
+    return str(value) if value is not None else ""
+
+def header_version(header):
+    if header and header[:2] == COLUMNS[:2]:
+        return SCHEMA_VERSION
+    if header and header[0] == LEGACY_COLUMNS[0]:
+        return 1
+    raise ValueError(f"Unrecognized session log header: {header!r}")
+
+def session_row(end, start, category, task, est_mins, actual_mins, completed, notes, focus_level, source):
+    # The one place a version 2 row is built, whoever logged the session.
+    # Without a start, the session is taken to have run without pauses until end.
+    end = normalize_date(end) if isinstance(end, str) else end.strftime(DATE_FMT)
+    actual = to_number(actual_mins)
+    if start is None or start == "":
+        start = (datetime.strptime(end, DATE_FMT) - timedelta(minutes=actual or 0)).strftime(DATE_FMT)
+    else:
+        start = normalize_date(start) if isinstance(start, str) else start.strftime(DATE_FMT)
+    focus = to_number(focus_level, int)
+    return [end, start, category, task, est_mins, actual_mins, normalize_completed(completed), notes,
+            "" if focus is None else focus, source]
+
+def upgrade_row(row, version, source):
+    # Any logged row as a version 2 row; ValueError/IndexError for malformed rows
+    if version == SCHEMA_VERSION:
+        row = list(row) + [""] * (len(COLUMNS) - len(row))
+        return session_row(*row[:len(COLUMNS) - 1], row[len(COLUMNS) - 1] or source)
+    row = list(row) + [""] * (len(LEGACY_COLUMNS) - len(row))
+    date, category, task, est, actual, completed, notes, focus = row[:len(LEGACY_COLUMNS)]
+    return session_row(date, None, category, task, est, actual, completed, notes, focus, source)
+
+def read_log(path, source=None):
+    # Yields version 2 rows from a log of either version, skipping malformed lines
+    # (archived partitions are gzipped)
+    source = source or os.path.basename(path).split(".")[0]
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        version = header_version(header)
+        for row in reader:
+            try:
+                yield upgrade_row(row, version, source)
+            except (ValueError, IndexError):
+                continue  # blank or malformed line
+
+def migrate(paths=LEGACY_FILES, out_path=LOG_FILE):
+    # Single streaming pass: every input is already in end-time order, so a merge
+    # keeps the output ordered without holding more than one row per file.
+    # Rows already in out_path are merged in too, and the inputs are renamed to
+    # *.v1.bak afterwards, so running it twice never duplicates sessions.
+    paths = [p for p in paths if os.path.isfile(p) and os.path.abspath(p) != os.path.abspath(out_path)]
+    sources = [read_log(p) for p in paths]
+    if os.path.isfile(out_path):
+        sources.append(read_log(out_path))
+    tmp_path = out_path + ".tmp"
+    count = 0
+    with open(tmp_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for row in heapq.merge(*sources, key=lambda r: r[0]):
+            writer.writerow(row)
+            count += 1
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, out_path)
+    for p in paths:
+        os.replace(p, p + ".v1.bak")
+    return count, paths
+
+class SessionStore:
+    def __init__(self, path=DB_FILE, import_legacy=True):
+        if import_legacy and not os.path.isfile(path):
+            # First run: the store is created and filled from the logs while holding
+            # the live log's lock. Writers insert into the store and append to the
+            # log under that same lock, so none of their rows can land in both while
+            # the import reads the log; a process that also found no store waits
+            # here and then finds it built.
+            while True:
+                with open(LOG_FILE, "a+b") as log, locked(log):
+                    if not replaced(log, LOG_FILE):  # not rotated while we waited
+                        self._open(path, not os.path.isfile(path))
+                        break
+        else:
+            self._open(path, False)
+
+    def _open(self, path, import_logs):
+        # Writers may flush from a timer thread; callers serialize access themselves
+        # Other processes may be writing too: wait for their transactions instead of failing
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        # WAL sticks to the file: only switch once, since switching needs the database
+        # to itself and fails at once (no busy timeout) while others are connected
+        if self.conn.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA + rollups.SCHEMA)
+        columns = [c[1] for c in self.conn.execute("PRAGMA table_info(sessions)")]
+        if "start" not in columns:
+            # Store created before the version 2 log; older rows keep start NULL
+            self.conn.execute("ALTER TABLE sessions ADD COLUMN start TEXT")
+        self.has_text_index = text_index.install(self.conn)
+        if import_logs:
+            # Every log there is (legacy files, archived months, the live log) goes in
+            from partitions import partition_paths  # partitions builds on this module
+            for log_path in LEGACY_FILES + partition_paths():
+                if os.path.isfile(log_path):
+                    self.import_csv(log_path)
+        elif self._rollups_missing():
+            # Store created before rollups existed
+            self.rebuild_rollups()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- WRITE ---
+    def append(self, row, source="gui"):
+        self.append_many([row], source)
+
+    def append_many(self, rows, source="gui"):
+        # rows are version 2 rows (see session_row); a row's own Source wins
+        records = []
+        for r in rows:
+            r = list(r) + [None] * (len(COLUMNS) - len(r))
+            end, start, category, task, est, actual, completed, notes, focus, src = r
+            records.append((normalize_date(end), normalize_date(start) if start else None, category, task,
+                            to_number(est), to_number(actual), str(completed), notes, to_number(focus, int),
+                            src or source))
+        # Rollups are updated in the same transaction, so they never disagree with sessions
+        totals = rollups.accumulate({}, ((r[0], r[2], r[4], r[5], r[8]) for r in records))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO sessions (date, start, category, task, est_mins, actual_mins, completed, notes, focus_level, source) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", records)
+            rollups.apply(self.conn, totals)
+        return len(records)
+
+    def rebuild_rollups(self, batch_size=10000):
+        # Recompute every rollup from the sessions table; memory is O(periods)
+        totals = {}
+        cur = self.conn.execute("SELECT date, category, est_mins, actual_mins, focus_level FROM sessions")
+        while True:
+            batch = cur.fetchmany(batch_size)
+            if not batch:
+                break
+            rollups.accumulate(totals, batch)
+        with self.conn:
+            self.conn.execute("DELETE FROM rollups")
+            rollups.apply(self.conn, totals)
+        return len(totals)
+
+    def _rollups_missing(self):
+        has_sessions = self.conn.execute("SELECT 1 FROM sessions LIMIT 1").fetchone()
+        has_rollups = self.conn.execute("SELECT 1 FROM rollups LIMIT 1").fetchone()
+        return bool(has_sessions) and not has_rollups
+
+    def import_csv(self, path, force=False):
+        # One-shot: a file that was already imported is skipped unless forced
+        key = os.path.abspath(path)
+        if not force and self.conn.execute("SELECT 1 FROM imports WHERE path = ?", (key,)).fetchone():
+            return 0
+        count, batch = 0, []
+        for row in read_log(path):
+            batch.append(row)
+            if len(batch) >= 5000:
+                count += self.append_many(batch)
+                batch = []
+        count += self.append_many(batch)
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO imports VALUES (?, ?, ?)",
+                              (key, count, datetime.now().strftime(DATE_FMT)))
+        return count
+
+    # --- READ ---
+    def query_range(self, start, end):
+        # Rows with start <= Date < end, served straight from the date index
+        return self._range_cursor(start, end).fetchall()
+
+    def iter_range(self, start, end, chunk_size=5000):
+        # Same scan, yielded in chunks so callers can aggregate in bounded memory
+        cur = self._range_cursor(start, end)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+
+    def _range_cursor(self, start, end):
+        return self.conn.execute(
+            f"SELECT {ROW_FIELDS} FROM sessions WHERE date >= ? AND date < ? ORDER BY date",
+            (start.strftime(DATE_FMT), end.strftime(DATE_FMT)))
+
+    def search(self, text, limit=50):
+        # Sessions whose Task or Notes contain every word of text, latest logged first,
+        # looked up in the text index (a full scan only without FTS5). The index
+        # walks its matches in id order, so the newest limit rows come without a sort.
+        if self.has_text_index:
+            query = text_index.match_query(text)
+            if query is None:
+                return []
+            return self.conn.execute(
+                f"SELECT {ROW_FIELDS} FROM sessions JOIN (SELECT rowid AS hit FROM sessions_text "
+                "WHERE sessions_text MATCH ? ORDER BY rowid DESC LIMIT ?) ON id = hit ORDER BY id DESC",
+                (query, limit)).fetchall()
+        where, args = text_index.like_terms(text)
+        if not where:
+            return []
+        return self.conn.execute(f"SELECT {ROW_FIELDS} FROM sessions WHERE {where} ORDER BY id DESC LIMIT ?",
+                                 args + [limit]).fetchall()
+
+    def query_day(self, day):
+        start = datetime.combine(day, datetime.min.time())
+        return self.query_range(start, start + timedelta(days=1))
+
+    def query_rollups(self, grain, first, last, category=rollups.ALL):
+        # Rollup rows with first <= period <= last; category=None returns every category
+        sql = f"SELECT period, category, {', '.join(rollups.FIELDS)} FROM rollups WHERE grain = ? AND period BETWEEN ? AND ?"
+        args = [grain, first, last]
+        if category is not None:
+            sql += " AND category = ?"
+            args.append(category)
+        cur = self.conn.execute(sql + " ORDER BY period, category", args)
+        names = [c[0] for c in cur.description]
+        return [dict(zip(names, row)) for row in cur.fetchall()]
+
+    def last_day(self):
+        row = self.conn.execute("SELECT MAX(date) FROM sessions").fetchone()
+        return datetime.strptime(row[0], DATE_FMT).date() if row and row[0] else None
+
+def main(argv):
+    # python session_store.py import [file ...]
+    # python session_store.py rebuild-rollups
+    # python session_store.py migrate [legacy file ...]
+    # python session_store.py search words ...
+    if len(argv) >= 2 and argv[1] == "migrate":
+        count, migrated = migrate(argv[2:] or LEGACY_FILES)
+        for path in migrated:
+            print(f"{path} -> {path}.v1.bak")
+        print(f"✅ {LOG_FILE}: {count} sessions (schema v{SCHEMA_VERSION})")
+        return
+    if len(argv) >= 3 and argv[1] == "search":
+        with SessionStore() as store:
+            rows = store.search(" ".join(argv[2:]))
+        for end, _, category, task, _, actual, _, notes, focus, _ in rows:
+            note = f" — {notes}" if notes else ""
+            print(f"{end}  [{category}] {task} ({actual or 0:g}m, focus {focus or '-'}){note}")
+        print(f"🔍 {len(rows)} sessions")
+        return
+    if len(argv) >= 2 and argv[1] == "rebuild-rollups":
+        with SessionStore(import_legacy=False) as store:
+            print(f"{store.rebuild_rollups()} rollup rows rebuilt")
+        return
+    if len(argv) < 2 or argv[1] != "import":
+        print("Usage: python session_store.py import [focus_sessions.csv work_log.csv ...]")
+        print("       python session_store.py rebuild-rollups")
+        print("       python session_store.py migrate [focus_sessions.csv work_log.csv ...]")
+        print("       python session_store.py search words ...")
+        return
+    files = argv[2:] or [f for f in LEGACY_FILES if os.path.isfile(f)]
+    with SessionStore(import_legacy=False) as store:
+        for path in files:
+            n = store.import_csv(path)
+            print(f"{path}: {n} rows imported" if n else f"{path}: already imported, skipped")
+
+if __name__ == "__main__":
+    main(sys.argv)
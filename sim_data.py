@@ -1,10 +1,14 @@
+import argparse
+import time
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from session_store import COLUMNS
 
 def generate_mock_data():
     # Use today's date for all entries
     today = datetime.now().strftime("%Y-%m-%d")
-    
+
     data = [
         # Date, Category, Task, Est, Actual, Completed, Notes, Focus
         [f"{today} 09:15", "Work", "Emails", 30, 35, "Yes", "Cleared inbox", 4],
@@ -14,13 +18,116 @@ def generate_mock_data():
         [f"{today} 15:45", "Admin", "Planning", 15, 20, "Yes", "Next week", 2],
         [f"{today} 21:10", "Personal", "Reading", 60, 60, "Yes", "New book", 4]
     ]
-    
+
     columns = ["Date", "Category", "Task", "Est_Mins", "Actual_Mins", "Completed", "Notes", "Focus_Level"]
     df = pd.DataFrame(data, columns=columns)
-    
+
     # Save to a specific test file
     df.to_csv("test_sessions.csv", index=False)
     print("✅ 'test_sessions.csv' created successfully with 6 entries.")
 
+# --- LARGE-SCALE GENERATOR ---
+# Category mix and typical session length (median minutes) per category
+CATEGORIES = {"Work": (0.40, 45), "Study": (0.25, 50), "Code": (0.20, 70), "Admin": (0.10, 15), "Personal": (0.05, 30)}
+TASKS = {
+    "Work": ["Emails", "Meeting prep", "Report", "Review"],
+    "Study": ["Mixed Models", "Linear Algebra", "Read paper", "Homework"],
+    "Code": ["flowclock", "UI Fix", "Refactor", "Bug hunt"],
+    "Admin": ["Planning", "Invoices", "Inbox zero"],
+    "Personal": ["Reading", "Journal", "Guitar"],
+}
+# Relative chance a session ends in each hour of the day: a morning and an
+# afternoon peak, and a late tail so some sessions run past midnight
+HOUR_WEIGHTS = np.array([2, 1, .5, .2, .2, .3, 1, 3, 6, 9, 10, 9, 6, 7, 9, 10, 9, 7, 5, 4, 4, 4, 4, 3], dtype=float)
+BAD_VALUES = {"End": "not-a-date", "Actual_Mins": "-5", "Focus_Level": "9"}
+
+def stamp(values):
+    # datetime64[s] -> "%Y-%m-%d %H:%M:%S" without a per-row strftime
+    return np.char.replace(np.datetime_as_string(values, unit="s"), "T", " ")
+
+def generate_sessions(path, days=365, users=1, sessions_per_day=8.0, bad_rate=0.001,
+                      legacy_date_rate=0.05, end=None, seed=0, days_per_chunk=30):
+    # Writes a version 2 session log, in end-time order, a chunk of days at a time
+    # so millions of rows never sit in memory at once. Every user logs independently,
+    # so sessions from different users overlap; each user is its own Source.
+    # Returns the number of rows written.
+    rng = np.random.default_rng(seed)
+    cats = list(CATEGORIES)
+    cat_p = np.array([CATEGORIES[c][0] for c in cats])
+    cat_median = np.array([CATEGORIES[c][1] for c in cats], dtype=float)
+    task_names = np.array([t for c in cats for t in TASKS[c]])
+    task_offset = np.cumsum([0] + [len(TASKS[c]) for c in cats])[:-1]
+    task_count = np.array([len(TASKS[c]) for c in cats])
+    hour_p = HOUR_WEIGHTS / HOUR_WEIGHTS.sum()
+
+    last_day = (end or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    first_day = np.datetime64(last_day - timedelta(days=days - 1), "s")
+    total = 0
+    for chunk_start in range(0, days, days_per_chunk):
+        n_days = min(days_per_chunk, days - chunk_start)
+        n = int(rng.poisson(sessions_per_day * users * n_days))
+        if n == 0:
+            continue
+
+        # 1. When: a day, an hour from the daily profile, a second within it
+        day = rng.integers(chunk_start, chunk_start + n_days, n)
+        secs = day * 86400 + rng.choice(24, n, p=hour_p) * 3600 + rng.integers(0, 3600, n)
+        order = np.argsort(secs, kind="stable")
+        secs = secs[order]
+        ends = first_day + secs.astype("timedelta64[s]")
+
+        # 2. What and how long: lognormal lengths around each category's median
+        cat = rng.choice(len(cats), n, p=cat_p)
+        actual = np.round(rng.lognormal(np.log(cat_median[cat]), 0.5), 2)
+        est = np.maximum(5, np.round(actual * rng.lognormal(0, 0.3, n) / 5) * 5).astype(int)
+        # Paused sessions span more wall time than they were active
+        paused = np.where(rng.random(n) < 0.2, rng.integers(1, 30, n), 0) * 60
+        starts = ends - (np.round(actual * 60).astype(np.int64) + paused).astype("timedelta64[s]")
+        task = task_names[task_offset[cat] + rng.integers(0, 1 << 30, n) % task_count[cat]]
+        focus = rng.choice([1, 2, 3, 4, 5], n, p=[.05, .15, .3, .3, .2]).astype(object)
+        focus[rng.random(n) < 0.1] = ""
+
+        df = pd.DataFrame({
+            "End": stamp(ends),
+            "Start": stamp(starts),
+            "Category": np.array(cats)[cat],
+            "Task": task,
+            "Est_Mins": est,
+            "Actual_Mins": actual,
+            "Completed": np.where(rng.random(n) < 0.85, "Yes", "No"),
+            "Notes": np.where(rng.random(n) < 0.05, "note, with a comma", ""),
+            "Focus_Level": focus,
+            "Source": np.char.add("sim-u", rng.integers(0, users, n).astype(str)),
+        }, columns=COLUMNS)
+
+        # 3. Dirt: the older "%Y-%m-%d %H:%M" format, and rows no loader should accept
+        legacy = rng.random(n) < legacy_date_rate
+        df.loc[legacy, "End"] = df.loc[legacy, "End"].str[:16]
+        bad = np.flatnonzero(rng.random(n) < bad_rate)
+        for col, rows in zip(BAD_VALUES, np.array_split(rng.permutation(bad), len(BAD_VALUES))):
+            if len(rows):
+                df[col] = df[col].astype(object)
+                df.loc[rows, col] = BAD_VALUES[col]
+
+        df.to_csv(path, mode="w" if total == 0 else "a", header=total == 0, index=False)
+        total += n
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic FlowClock session logs")
+    parser.add_argument("out", nargs="?", help="output CSV (omit for the 6-row test_sessions.csv)")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--per-day", type=float, default=8.0, help="mean sessions per user per day")
+    parser.add_argument("--bad-rate", type=float, default=0.001)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.out is None:
+        generate_mock_data()
+        return
+    began = time.perf_counter()
+    n = generate_sessions(args.out, args.days, args.users, args.per_day, args.bad_rate, seed=args.seed)
+    print(f"✅ '{args.out}': {n} sessions in {time.perf_counter() - began:.1f}s")
+
 if __name__ == "__main__":
-    generate_mock_data()
\ No newline at end of file
+    main()
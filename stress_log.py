@@ -0,0 +1,104 @@
+import argparse
+import csv
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Many processes logging to the same sessions.csv and store at once, the way a
+# GUI and a CLI (or several) do, then checks that nothing was torn, lost or
+# duplicated: one header, every row whole, every row exactly once in the CSV
+# and in the store.
+#
+#   python stress_log.py                     # 32 writers x 200 rows
+#   python stress_log.py --writers 64 --rows 500
+
+def writer_process(n, rows, barrier):
+    from logger import SessionWriter
+    from session_store import session_row
+    rng = random.Random(n)
+    barrier.wait()  # everyone creates the file and the store at the same moment
+    # Mix of buffer sizes: some flush every row (like log_session), some batch
+    with SessionWriter("sessions.csv", max_rows=rng.choice([1, 1, 7, 50]), max_delay=0) as writer:
+        for i in range(rows):
+            notes = "multi-line\nnote, with \"quotes\"" if i % 10 == 0 else "x" * rng.randint(0, 300)
+            writer.write(session_row(datetime.now(), None, "Work", f"w{n}-{i}", 25, 25.0, "Yes",
+                                     notes, rng.randint(1, 5), "stress"))
+            if rng.random() < 0.05:
+                writer.flush()
+                time.sleep(rng.random() / 100)
+
+def check(writers, rows):
+    from session_store import COLUMNS
+    expected = {f"w{n}-{i}" for n in range(writers) for i in range(rows)}
+    problems = []
+
+    with open("sessions.csv", newline="") as f:
+        records = list(csv.reader(f))
+    if records[0] != COLUMNS:
+        problems.append(f"bad header: {records[0]}")
+    headers = sum(1 for r in records if r == COLUMNS)
+    if headers != 1:
+        problems.append(f"{headers} headers")
+    body = [r for r in records[1:] if r != COLUMNS]
+    torn = [r for r in body if len(r) != len(COLUMNS)]
+    if torn:
+        problems.append(f"{len(torn)} torn rows, e.g. {torn[0]}")
+    tasks = [r[3] for r in body if len(r) == len(COLUMNS)]
+    problems += compare("csv", tasks, expected)
+
+    with sqlite3.connect("flowclock.db") as conn:
+        tasks = [r[0] for r in conn.execute("SELECT task FROM sessions")]
+    problems += compare("store", tasks, expected)
+    return problems
+
+def compare(name, tasks, expected):
+    problems = []
+    if len(tasks) != len(set(tasks)):
+        problems.append(f"{name}: {len(tasks) - len(set(tasks))} duplicated rows")
+    missing = expected - set(tasks)
+    if missing:
+        problems.append(f"{name}: {len(missing)} missing rows")
+    extra = set(tasks) - expected
+    if extra:
+        problems.append(f"{name}: {len(extra)} unexpected rows")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress-test concurrent FlowClock logging")
+    parser.add_argument("--writers", type=int, default=32)
+    parser.add_argument("--rows", type=int, default=200)
+    args = parser.parse_args()
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # the log and the store are created in the working directory
+        barrier = multiprocessing.Barrier(args.writers)
+        procs = [multiprocessing.Process(target=writer_process, args=(n, args.rows, barrier))
+                 for n in range(args.writers)]
+        began = time.perf_counter()
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        seconds = time.perf_counter() - began
+        failed = [p.exitcode for p in procs if p.exitcode != 0]
+        print(f"{args.writers} writers x {args.rows} rows in {seconds:.1f}s")
+
+        problems = check(args.writers, args.rows)
+        if failed:
+            problems.append(f"{len(failed)} writers crashed")
+        for problem in problems:
+            print(f"  ❌ {problem}")
+        os.chdir(here)
+    if problems:
+        sys.exit(1)
+    print("  ✅ no torn, lost or duplicated rows")
+
+if __name__ == "__main__":
+    main()
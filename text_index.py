@@ -0,0 +1,56 @@
+import re
+import sqlite3
+
+# Inverted index over each session's Task and Notes, kept next to the sessions
+# table (an FTS5 table whose content is the sessions table itself). Triggers
+# index every row as it is inserted, in the same transaction, so whatever
+# logs through the store (log_session, imports) is searchable straight away.
+# Matching is word by word, case- and accent-insensitive; every word of the
+# query must appear (in Task or Notes), and the last one may be a prefix so
+# results keep up while typing.
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS sessions_text USING fts5(
+    task, notes, content='sessions', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS sessions_text_insert AFTER INSERT ON sessions BEGIN
+    INSERT INTO sessions_text (rowid, task, notes) VALUES (new.id, new.task, new.notes);
+END;
+CREATE TRIGGER IF NOT EXISTS sessions_text_delete AFTER DELETE ON sessions BEGIN
+    INSERT INTO sessions_text (sessions_text, rowid, task, notes) VALUES ('delete', old.id, old.task, old.notes);
+END;
+CREATE TRIGGER IF NOT EXISTS sessions_text_update AFTER UPDATE OF task, notes ON sessions BEGIN
+    INSERT INTO sessions_text (sessions_text, rowid, task, notes) VALUES ('delete', old.id, old.task, old.notes);
+    INSERT INTO sessions_text (rowid, task, notes) VALUES (new.id, new.task, new.notes);
+END;
+"""
+WORD = re.compile(r"\w+")
+
+def install(conn):
+    # False if this SQLite was built without FTS5; search then falls back to a scan.
+    # An index added to a store that already has sessions is filled from them once.
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sessions_text'").fetchone()
+    try:
+        with conn:
+            conn.executescript(SCHEMA)
+            if not exists:
+                rebuild(conn)
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+def rebuild(conn):
+    conn.execute("INSERT INTO sessions_text (sessions_text) VALUES ('rebuild')")
+
+def match_query(text):
+    # "thesis chap" -> '"thesis" "chap"*'; None when there is nothing to look for
+    words = WORD.findall(text)
+    if not words:
+        return None
+    return " ".join(f'"{w}"' for w in words) + "*"
+
+def like_terms(text):
+    # The same words for the fallback scan: every one in task or notes
+    words = WORD.findall(text)
+    sql = " AND ".join("(task LIKE ? OR notes LIKE ?)" for _ in words)
+    return sql, [f"%{w}%" for w in words for _ in range(2)]
@@ -0,0 +1,115 @@
+import math
+import time
+import metrics
+
+class MonotonicClock:
+    # Running time derived from time.monotonic() deltas, so a late callback or a
+    # stalled UI never loses or adds time. Pausing banks the time run so far.
+    # Every start..pause run is also kept in segments as [wall_start, wall_end,
+    # seconds] (wall_end is None while the segment is still open).
+
+    def __init__(self, time_fn=time.monotonic, wall_fn=time.time):
+        self.time_fn = time_fn
+        self.wall_fn = wall_fn
+        self.segments = []
+        self._banked = 0.0
+        self._started_at = None
+
+    @property
+    def running(self):
+        return self._started_at is not None
+
+    def start(self):
+        if self._started_at is None:
+            self._started_at = self.time_fn()
+            self.segments.append([self.wall_fn(), None, 0.0])
+
+    def pause(self):
+        if self._started_at is not None:
+            seconds = self.time_fn() - self._started_at
+            self._banked += seconds
+            self._started_at = None
+            self.segments[-1][1:] = [self.wall_fn(), seconds]
+
+    def reset(self):
+        self._banked = 0.0
+        self._started_at = None
+        self.segments = []
+
+    def restore(self, elapsed, segments=None):
+        # Stopped clock holding time run elsewhere (e.g. before a crash)
+        self._banked = float(elapsed)
+        self._started_at = None
+        self.segments = [list(s) for s in segments or []]
+
+    def elapsed(self):
+        if self._started_at is None:
+            return self._banked
+        return self._banked + (self.time_fn() - self._started_at)
+
+    def ms_to_next_second(self):
+        # Delay until elapsed time crosses the next whole second, which is
+        # exactly when a whole-second countdown or stopwatch display changes
+        e = self.elapsed()
+        return max(1, math.ceil((math.floor(e) + 1 - e) * 1000))
+
+class Ticker:
+    # Calls on_tick(elapsed) once per whole second of running time. Scheduling
+    # goes through the after/after_cancel pair it is given (a Tk widget's in the
+    # GUIs), so it can be driven by a fake scheduler without Tk.
+    # start()/pause() also run the clock; run()/stop() only (un)schedule ticks,
+    # for when the clock belongs to someone else (e.g. a TimerEngine).
+
+    def __init__(self, after, after_cancel, on_tick, clock=None):
+        self.after = after
+        self.after_cancel = after_cancel
+        self.on_tick = on_tick
+        self.clock = clock or MonotonicClock()
+        self._job = None
+        self._due = None
+
+    def start(self):
+        self.clock.start()
+        self.run()
+
+    def pause(self):
+        self.clock.pause()
+        self.stop()
+
+    def run(self):
+        self._schedule(0)
+
+    def stop(self):
+        self._cancel()
+
+    def reset(self):
+        self._cancel()
+        self.clock.reset()
+
+    def elapsed(self):
+        return self.clock.elapsed()
+
+    def _schedule(self, ms):
+        # Only one pending tick at a time, however often start() is called
+        self._cancel()
+        self._due = time.perf_counter() + ms / 1000
+        self._job = self.after(ms, self._fire)
+
+    def _cancel(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+
+    def _fire(self):
+        self._job = None
+        if not self.clock.running:
+            return
+        elapsed = self.clock.elapsed()
+        if metrics.ENABLED:
+            # How late after() ran us, and how far the tick landed from its whole second
+            metrics.observe("tick.after_late", max(0.0, time.perf_counter() - self._due) * 1000)
+            metrics.observe("tick.jitter", abs(elapsed - round(elapsed)) * 1000)
+        with metrics.span("tick.callback"):
+            self.on_tick(elapsed)
+        if self.clock.running:
+            self._schedule(self.clock.ms_to_next_second())
@@ -1,8 +1,31 @@
+import sys
+import threading
+import time
+_START = time.perf_counter()
+
 import customtkinter as ctk
-from logger import log_session
-from audio_player import play_alarm, stop_alarm
+from datetime import datetime
+from logger import log_session, add_listener
+from audio_player import play_alarm, stop_alarm, preload as preload_audio
 import tkinter as tk
-from dashboard import DashboardWindow 
+from ticker import Ticker
+from timer_engine import TimerEngine, IDLE, RUNNING, PAUSED, ALARM
+from journal import SessionJournal, recover, discard as discard_journal
+from backlog import Backlog
+from session_cache import TodaySessions
+import metrics
+# dashboard (and with it pandas) is imported on first use in open_dashboard
+
+_IMPORTS_DONE = time.perf_counter()
+# Cold start target for --profile-startup: process start to first painted frame
+STARTUP_BUDGET_MS = 800
+# Performance overlay (F12): histogram name and label, in display order
+OVERLAY_METRICS = [("tick.jitter", "tick jitter"), ("tick.after_late", "after() late"),
+                   ("tick.callback", "tick"), ("log.session", "log_session"),
+                   ("dashboard.load_today", "dash load"), ("dashboard.render", "dash render"),
+                   ("loader.deliver", "dash deliver"), ("audio.start", "audio start")]
+METRICS_EXPORT = "flowclock_metrics.json"
+TRACE_EXPORT = "flowclock_trace.json"
 
 class FlowClock(ctk.CTk):
     def __init__(self):
@@ -17,13 +40,37 @@ class FlowClock(ctk.CTk):
         ctk.set_appearance_mode("dark")
         
         # --- State Variables ---
-        self.remaining_seconds = 0
-        self.total_initial_seconds = 0
-        self.elapsed_seconds = 0
-        self.is_running = False
-        self.mode = "countdown"
+        # The countdown/alarm/overtime state machine lives in TimerEngine; this
+        # window only renders its events. The Ticker wakes the engine once per second.
+        self.engine = TimerEngine()
+        self.ticker = Ticker(self.after, self.after_cancel, lambda elapsed: self.engine.tick(), clock=self.engine.clock)
+        self.engine.on("state", self.on_state_change)
+        self.engine.on("tick", self.update_clock)
+        self.engine.on("alarm", self.trigger_alarm_state)
+        # Crash journal: every transition plus a checkpoint every 30 s of running time
+        self.journal = SessionJournal()
+        self.engine.on("state", self.journal_state)
+        self.engine.on("tick", lambda seconds: self.journal.checkpoint(self.engine.clock.elapsed()))
+        self.dashboard = None
+        # Today's sessions in memory: every row logged below is handed to it as it
+        # is written, and the dashboard reads from it instead of the disk. The first
+        # read of the log happens in the background now rather than on first open.
+        self.sessions = TodaySessions()
+        add_listener(self.sessions.appended)
+        threading.Thread(target=self.sessions.rows, name="sessions-load", daemon=True).start()
+        # To-do backlog: suggestions while typing a task, and the "Start Next Task" queue
+        self.backlog = Backlog()
+        self.current_task_id = None
+        self._search_job = None
         
         self.setup_ui()
+        self.offer_recovery()
+        # Performance overlay: built on first use, metrics only collected while it is up
+        # (or for the whole run with FLOWCLOCK_METRICS set)
+        self.metrics_frame = None
+        self._metrics_job = None
+        self._metrics_always = metrics.ENABLED
+        self.bind("<F12>", self.toggle_metrics)
 
     def setup_ui(self):
         # Header
@@ -40,10 +87,24 @@ class FlowClock(ctk.CTk):
 
         self.task_entry = ctk.CTkEntry(self.main_input_frame, placeholder_text="What are you working on?", width=350, height=40)
         self.task_entry.pack(pady=10)
+        self.task_entry.bind("<KeyRelease>", self.on_task_typed)
+
+        # Backlog matches for what's typed so far (buttons made once, relabelled per search)
+        self.suggest_frame = ctk.CTkFrame(self.main_input_frame, fg_color="#1E1E1E", corner_radius=8)
+        self.suggest_btns = [ctk.CTkButton(self.suggest_frame, text="", width=340, height=26, anchor="w",
+                                           fg_color="transparent", hover_color="#2A2A2A")
+                             for _ in range(5)]
 
         self.est_entry = ctk.CTkEntry(self.main_input_frame, placeholder_text="Estimated Minutes (e.g. 25)", width=350, height=40)
         self.est_entry.pack(pady=10)
 
+        self.queue_btn = ctk.CTkButton(self.main_input_frame, text="Add to Queue", width=350, height=28,
+                                       fg_color="#2A2A2A", command=self.queue_task)
+        self.queue_btn.pack(pady=(0, 5))
+        self.queue_label = ctk.CTkLabel(self.main_input_frame, text="", font=("Helvetica", 12), text_color="#888888")
+        self.queue_label.pack()
+        self.update_queue_label()
+
         # --- 2. CANVAS CIRCLE ---
         self.canvas_size = 220
         # Canvas background now matches window exactly
@@ -99,7 +160,7 @@ class FlowClock(ctk.CTk):
 
         self.next_task_btn = ctk.CTkButton(self.success_frame, text="Start Next Task", 
                                           fg_color="green", height=45, width=250, 
-                                          command=self.reset_timer)
+                                          command=self.start_next_task)
         self.next_task_btn.pack(pady=10)
         
         # Reset Button
@@ -116,61 +177,132 @@ class FlowClock(ctk.CTk):
                          command=lambda val=i: self.finalize_data(val)).grid(row=0, column=i-1, padx=2)
 
     def handle_start(self):
-        if self.mode == "countdown": self.start_countdown()
-        else: self.start_stopwatch()
+        # The alarm screen's "Keep Going" starts overtime; phase is still "countdown" there
+        if self.engine.state == ALARM or self.engine.phase == "overtime": self.start_stopwatch()
+        else: self.start_countdown()
 
     def start_countdown(self):
-        if not self.is_running:
+        if self.engine.state in (IDLE, PAUSED):
             try:
-                if self.remaining_seconds == 0:
-                    mins = int(self.est_entry.get())
-                    self.remaining_seconds = mins * 60
-                    self.total_initial_seconds = self.remaining_seconds
-                self.is_running = True
+                if self.engine.state == IDLE:
+                    self.engine.start(float(self.est_entry.get()))  # whole seconds (see TimerEngine.start)
+                    preload_audio()
+                    self.hide_suggestions()
+                    title = self.task_entry.get().strip()
+                    if self.current_task_id is None and title:
+                        self.current_task_id = self.backlog.ensure(title, self.category_var.get(), self.engine.total_seconds / 60)
+                    if self.current_task_id is not None:
+                        self.backlog.start(self.current_task_id)
+                        self.update_queue_label()
+                else:
+                    self.engine.resume()
                 self.pause_btn.configure(state="normal", text="Pause")
                 self.status_label.configure(text="Deep Work...", text_color="white")
-                self.update_clock()
             except ValueError:
                 self.canvas.itemconfig(self.timer_text, text="Err", fill="red")
 
     def toggle_pause(self):
         try: stop_alarm()
         except: pass          
-        if self.is_running:
-            self.is_running = False
+        if self.engine.running:
+            self.engine.pause()
             self.pause_btn.configure(text="Resume")
-        else:
-            self.is_running = True
+        elif self.engine.state in (PAUSED, ALARM):
+            if self.engine.state == ALARM: self.engine.keep_going()
+            else: self.engine.resume()
             self.pause_btn.configure(text="Pause")
-            self.update_clock()
-
-    def update_clock(self):
-        if not self.is_running: return
-        if self.mode == "countdown":
-            if self.remaining_seconds > 0:
-                self.remaining_seconds -= 1
-                self.display_time(self.remaining_seconds)
-                extent = (self.remaining_seconds / self.total_initial_seconds) * 360
-                self.canvas.itemconfig(self.progress_arc, extent=extent, outline="#3a7ebf")
-                self.after(1000, self.update_clock)
-            else:
-                self.trigger_alarm_state()
-        elif self.mode == "stopwatch":
-            self.elapsed_seconds += 1
-            est_mins = int(self.est_entry.get() or 0)
-            total_secs = (est_mins * 60) + self.elapsed_seconds
-            self.display_time(total_secs)
+
+    def journal_state(self, old, new):
+        # A reset throws the session away; anything else is journaled
+        if new == IDLE:
+            self.journal.end()
+        elif old == IDLE and new == RUNNING:
+            if self.orphan is not None:
+                self.commit_orphan()  # starting over still logs the unfinished one
+            self.journal.begin(self.category_var.get(), self.task_entry.get() or "Unnamed Task",
+                               self.engine.total_seconds / 60)
+        else:
+            self.journal.record(new, self.engine.clock.elapsed())
+
+    # --- RECOVERY (the app closed mid-session last time) ---
+    def offer_recovery(self):
+        self.orphan = recover()
+        if self.orphan is None:
+            return
+        o = self.orphan
+        mins, secs = divmod(int(o["elapsed"]), 60)
+        self.recover_frame = ctk.CTkFrame(self, fg_color="#1E1E1E", corner_radius=12)
+        ctk.CTkLabel(self.recover_frame, text=f"Unfinished session: [{o['category']}] {o['task']}\n"
+                     f"{mins:02d}:{secs:02d} recorded before FlowClock closed",
+                     font=("Helvetica", 13), wraplength=350).pack(padx=15, pady=(10, 5))
+        btns = ctk.CTkFrame(self.recover_frame, fg_color="transparent")
+        btns.pack(pady=(0, 10))
+        ctk.CTkButton(btns, text="Resume", width=100, command=self.resume_orphan).grid(row=0, column=0, padx=5)
+        ctk.CTkButton(btns, text="Log It", width=100, fg_color="green", command=self.commit_orphan).grid(row=0, column=1, padx=5)
+        ctk.CTkButton(btns, text="Discard", width=100, fg_color="#d9534f", command=self.discard_orphan).grid(row=0, column=2, padx=5)
+        self.recover_frame.pack(pady=(0, 10), after=self.status_label)
+
+    def take_orphan(self):
+        self.recover_frame.pack_forget()
+        orphan, self.orphan = self.orphan, None
+        return orphan
+
+    def resume_orphan(self):
+        o = self.take_orphan()
+        self.category_var.set(o["category"])
+        self.task_entry.delete(0, "end")
+        self.task_entry.insert(0, o["task"])
+        self.est_entry.delete(0, "end")
+        self.est_entry.insert(0, f"{o['est_mins']:g}")
+        # Journal first: restore() records the PAUSED state on top of it
+        self.journal.begin(o["category"], o["task"], o["est_mins"], elapsed=o["elapsed"], started_at=o["started_at"])
+        self.engine.restore(o["est_mins"], o["elapsed"], o["overtime"],
+                            [[o["started_at"], o["last_wall"], o["elapsed"]]])
+        # Not started through start_countdown, so load the alarm here too
+        preload_audio()
+        self.pause_btn.configure(state="normal", text="Resume")
+        self.status_label.configure(text="Session Restored", text_color="#f1c40f")
+        if o["overtime"]:
+            self.start_btn.configure(text="Keep Going", fg_color="#3498db")
+            self.reset_btn.configure(text="Log Results", fg_color="green", command=self.initiate_review)
+
+    def commit_orphan(self):
+        o = self.take_orphan()
+        seconds = o["elapsed"] if o["overtime"] else min(o["elapsed"], o["est_mins"] * 60)
+        completed = "Yes" if o["overtime"] or o["state"] in (ALARM, "review") else "No"
+        log_session(o["category"], o["task"], o["est_mins"], round(seconds / 60, 2), completed,
+                    "Recovered after an interrupted session", None,
+                    started_at=datetime.fromtimestamp(o["started_at"]))
+        discard_journal()
+        self.status_label.configure(text="Recovered Session Logged", text_color="#2ecc71")
+
+    def discard_orphan(self):
+        self.take_orphan()
+        discard_journal()
+
+    def on_state_change(self, old, new):
+        # Only schedule ticks while the engine's clock is actually running
+        if self.engine.running: self.ticker.run()
+        else: self.ticker.stop()
+
+    @metrics.timed("timer.render")
+    def update_clock(self, seconds):
+        if self.engine.phase == "countdown":
+            self.display_time(seconds)
+            extent = (seconds / self.engine.total_seconds) * 360 if self.engine.total_seconds else 0
+            self.canvas.itemconfig(self.progress_arc, extent=extent, outline="#3a7ebf")
+        else:
+            # Overtime shows the full running time: estimate plus overtime
+            self.display_time(self.engine.total_seconds + seconds)
             self.canvas.itemconfig(self.progress_arc, extent=359.9, outline="#2ecc71")
-            self.after(1000, self.update_clock)
 
     def display_time(self, total_seconds):
         mins, secs = divmod(total_seconds, 60)
         self.canvas.itemconfig(self.timer_text, text=f"{mins:02d}:{secs:02d}")
 
     def trigger_alarm_state(self):
-        self.is_running = False 
-        play_alarm()
-        self.mode = "stopwatch"
+        # Never waits on the audio preload (this is the Tk thread); no audio, the bell
+        if not play_alarm(): self.bell()
         self.status_label.configure(text="Time's Up!", text_color="#3498db")
         self.start_btn.configure(text="Keep Going", fg_color="#3498db")
         self.reset_btn.configure(text="Log Results", fg_color="green", command=self.initiate_review)
@@ -178,31 +310,38 @@ class FlowClock(ctk.CTk):
     def start_stopwatch(self):
         try: stop_alarm()
         except: pass
-        self.is_running = True
-        self.update_clock()
+        if self.engine.state == ALARM: self.engine.keep_going()
+        else: self.engine.resume()
 
     def initiate_review(self):
-        self.is_running = False
+        self.engine.finish()
         try: stop_alarm()
         except: pass
         self.main_input_frame.pack_forget()
         self.btn_frame.pack_forget()
         self.reset_btn.pack_forget()
         
-        est_mins = int(self.est_entry.get() or 0)
-        total_secs = (est_mins * 60) + self.elapsed_seconds
-        self.display_time(total_secs)
+        self.display_time(int(self.engine.actual_seconds()))
         self.canvas.itemconfig(self.progress_arc, extent=359.9, outline="#2ecc71")
         self.canvas.itemconfig(self.timer_text, fill="#2ecc71")
         
         self.review_frame.pack(pady=10)
         self.status_label.configure(text="Session Review", text_color="#f1c40f")
 
+    def started_at(self):
+        # Wall time the first run of this session began
+        segments = self.engine.clock.segments
+        return datetime.fromtimestamp(segments[0][0]) if segments else None
+
     def finalize_data(self, focus_score):
-        try: est_mins = int(self.est_entry.get())
-        except: est_mins = 0
-        actual_mins = round(est_mins + (self.elapsed_seconds / 60), 2)
-        log_session(self.category_var.get(), self.task_entry.get() or "Unnamed Task", est_mins, actual_mins, "Yes", self.notes_text.get("1.0", "end-1c"), focus_score)
+        try: est_mins = float(self.est_entry.get())
+        except ValueError: est_mins = 0
+        actual_mins = round(self.engine.actual_seconds() / 60, 2)
+        log_session(self.category_var.get(), self.task_entry.get() or "Unnamed Task", est_mins, actual_mins, "Yes", self.notes_text.get("1.0", "end-1c"), focus_score, started_at=self.started_at())
+        self.journal.end()
+        if self.current_task_id is not None:
+            self.backlog.complete(self.current_task_id)
+            self.current_task_id = None
         self.show_success_page(actual_mins)
 
     def show_success_page(self, actual_mins):
@@ -213,13 +352,125 @@ class FlowClock(ctk.CTk):
         self.status_label.configure(text="Goal Achieved!", text_color="#2ecc71")
 
     def open_dashboard(self):
-        DashboardWindow(self)
+        # One dashboard per app: later opens refresh the existing window in place
+        if self.dashboard is not None and self.dashboard.winfo_exists():
+            self.dashboard.refresh()
+            return
+        from dashboard import DashboardWindow
+        self.dashboard = DashboardWindow(self, sessions=self.sessions)
+
+    # --- PERFORMANCE OVERLAY ---
+    def toggle_metrics(self, event=None):
+        if self.metrics_frame is not None and self.metrics_frame.winfo_ismapped():
+            self.metrics_frame.place_forget()
+            if self._metrics_job is not None:
+                self.after_cancel(self._metrics_job)
+                self._metrics_job = None
+            metrics.enable(self._metrics_always)
+            return
+        if self.metrics_frame is None:
+            self.metrics_frame = ctk.CTkFrame(self, fg_color="#1E1E1E", corner_radius=8)
+            self.metrics_label = ctk.CTkLabel(self.metrics_frame, text="", font=("Courier", 11),
+                                              text_color="#AAAAAA", justify="left")
+            self.metrics_label.pack(padx=10, pady=(8, 4))
+            ctk.CTkButton(self.metrics_frame, text="Export", width=80, height=24,
+                          command=self.export_metrics).pack(pady=(0, 8))
+        metrics.enable()
+        self.metrics_frame.place(relx=0.5, rely=1.0, y=-10, anchor="s")
+        self.metrics_frame.lift()
+        self.refresh_metrics()
+
+    def refresh_metrics(self):
+        histograms = metrics.snapshot()["histograms"]
+        fmt = lambda v: f"{v:7.1f}" if v is not None else "      -"
+        lines = [f"{'ms':<13}{'p50':>7}{'p95':>7}{'max':>7}      n"]
+        for name, label in OVERLAY_METRICS:
+            h = histograms.get(name)
+            if h:
+                lines.append(f"{label:<13}{fmt(h['p50'])}{fmt(h['p95'])}{fmt(h['max'])}{h['count']:>7}")
+            else:
+                lines.append(f"{label:<13}{fmt(None)}{fmt(None)}{fmt(None)}{0:>7}")
+        self.metrics_label.configure(text="\n".join(lines))
+        self._metrics_job = self.after(1000, self.refresh_metrics)
+
+    def export_metrics(self):
+        metrics.export_json(METRICS_EXPORT)
+        metrics.export_trace(TRACE_EXPORT)
+        self.status_label.configure(text=f"Metrics saved to {TRACE_EXPORT}", text_color="#888888")
+
+    # --- BACKLOG ---
+    def on_task_typed(self, event=None):
+        # Typing unlinks a picked task; searching waits for a pause in typing
+        self.current_task_id = None
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(120, self.show_suggestions)
+
+    def show_suggestions(self):
+        self._search_job = None
+        matches = self.backlog.search(self.task_entry.get(), limit=len(self.suggest_btns))
+        if not matches or self.engine.state != IDLE:
+            self.hide_suggestions()
+            return
+        for btn, task in zip(self.suggest_btns, matches):
+            est = f" · {task['est_mins']:g}m" if task["est_mins"] else ""
+            btn.configure(text=f"{task['title']}  [{task['category'] or '-'}]{est}",
+                          command=lambda t=task: self.pick_task(t))
+            if not btn.winfo_manager():
+                btn.pack(padx=5, pady=1)
+        for btn in self.suggest_btns[len(matches):]:
+            btn.pack_forget()
+        if not self.suggest_frame.winfo_manager():
+            self.suggest_frame.pack(after=self.task_entry, pady=(0, 5))
+
+    def hide_suggestions(self):
+        self.suggest_frame.pack_forget()
+
+    def pick_task(self, task):
+        self.task_entry.delete(0, "end")
+        self.task_entry.insert(0, task["title"])
+        if task["category"]:
+            self.category_var.set(task["category"])
+        if task["est_mins"]:
+            self.est_entry.delete(0, "end")
+            self.est_entry.insert(0, f"{task['est_mins']:g}")
+        self.current_task_id = task["id"]
+        self.hide_suggestions()
+
+    def queue_task(self):
+        title = self.task_entry.get().strip()
+        if not title:
+            return
+        try: est = float(self.est_entry.get())
+        except ValueError: est = None
+        task_id = self.current_task_id or self.backlog.ensure(title, self.category_var.get(), est)
+        self.backlog.enqueue(task_id)
+        self.current_task_id = None
+        self.task_entry.delete(0, "end")
+        self.est_entry.delete(0, "end")
+        self.hide_suggestions()
+        self.update_queue_label()
+
+    def update_queue_label(self):
+        queued = self.backlog.queue()
+        text = f"Queue: {len(queued)} · next: {queued[0]['title']}" if queued else ""
+        self.queue_label.configure(text=text)
+
+    def start_next_task(self):
+        # Pulls the front of the queue into the form, ready to start
+        self.reset_timer()
+        task = self.backlog.next_task()
+        if task is None:
+            return
+        self.pick_task(task)
+        self.status_label.configure(text=f"Up Next: {task['title']}", text_color="white")
 
     def reset_timer(self):
-        self.is_running = False
-        self.remaining_seconds = 0
-        self.elapsed_seconds = 0
-        self.mode = "countdown"
+        # An abandoned task goes back to the backlog
+        if self.current_task_id is not None and self.engine.state != IDLE:
+            self.backlog.reopen(self.current_task_id)
+            self.current_task_id = None
+        self.engine.reset()
         try: stop_alarm()
         except: pass
         self.success_frame.pack_forget()
@@ -234,6 +485,23 @@ class FlowClock(ctk.CTk):
         self.start_btn.configure(text="Start", fg_color=["#3a7ebf", "#1f538d"], command=self.handle_start)
         self.reset_btn.configure(text="Reset & Clear", fg_color="#d9534f", command=self.reset_timer)
 
+def report_startup(app, window_built):
+    # Runs from the first idle callback, i.e. once the first frame is on screen
+    app.update_idletasks()
+    painted = time.perf_counter()
+    ms = lambda a, b: (b - a) * 1000
+    total = ms(_START, painted)
+    print(f"imports:      {ms(_START, _IMPORTS_DONE):7.1f} ms")
+    print(f"window setup: {ms(_IMPORTS_DONE, window_built):7.1f} ms")
+    print(f"first paint:  {ms(window_built, painted):7.1f} ms")
+    print(f"total:        {total:7.1f} ms (budget {STARTUP_BUDGET_MS} ms){'  OVER BUDGET' if total > STARTUP_BUDGET_MS else ''}")
+    eager = [m for m in ("pandas", "pygame", "dashboard") if m in sys.modules]
+    if eager:
+        print(f"warning: loaded before first use: {', '.join(eager)}")
+
 if __name__ == "__main__":
     app = FlowClock()
+    if "--profile-startup" in sys.argv:
+        window_built = time.perf_counter()
+        app.after_idle(lambda: report_startup(app, window_built))
     app.mainloop()
\ No newline at end of file
@@ -1,9 +1,14 @@
 import time
 import csv
-import os
-import subprocess
+import io
 import sys
 from datetime import datetime
+from timer_engine import TimerEngine, ALARM, OVERTIME
+from audio_player import play_alarm, stop_alarm, preload as preload_audio, LOAD_TIMEOUT
+from logger import get_writer
+from session_store import session_row
+from journal import SessionJournal, recover, discard as discard_journal
+from file_lock import append_locked
 
 class Task:
     def __init__(self, name, category, estimated_mins):
@@ -13,6 +18,8 @@ class Task:
         self.actual_mins = 0.0  
         self.completed = False
         self.notes = ""
+        # [wall_start, wall_end, seconds] for each stretch the timer actually ran
+        self.segments = []
 
 def get_single_task():
     print("\n" + "="*40)
@@ -36,98 +43,164 @@ def get_single_task():
         print("\n❌ Error: Please enter a whole number for minutes.")
         sys.exit()
 
-def run_timer(task):
-    seconds_remaining = task.estimated_mins * 60
+# Crash journal for the session in progress; see journal.py
+_journal = SessionJournal()
+
+def run_timer(task, engine=None):
+    # engine: a restored session to carry on with (see resume_orphan)
+    if engine is None:
+        engine = TimerEngine()
+        _journal.begin(task.category, task.name, task.estimated_mins)
+        engine.start(task.estimated_mins)
+    engine.on("state", lambda old, new: _journal.record(new, engine.clock.elapsed()))
+    engine.resume()
+    # Decode the alarm in the background while the countdown runs
+    preload_audio()
     
-    while seconds_remaining > 0:
+    # A restored session may already be in overtime
+    while engine.state not in (ALARM, OVERTIME):
         try:
-            m, s = divmod(int(seconds_remaining), 60)
+            m, s = divmod(engine.remaining_seconds(), 60)
             # Live countdown display
             print(f"⏳ FOCUSING: {m:02d}:{s:02d} | (Ctrl+C to Pause/Exit)", end="\r")
-            time.sleep(1)
-            seconds_remaining -= 1
-            task.actual_mins += (1/60) # Log progress incrementally
+            # Sleep until the display changes; the engine measures the real time passed
+            time.sleep(engine.ms_to_next_tick() / 1000)
+            engine.tick()
+            _journal.checkpoint(engine.clock.elapsed())
             
         except KeyboardInterrupt:
             # THE EMERGENCY BRAKE (Pause Menu)
+            engine.pause()
+            m, s = divmod(engine.remaining_seconds(), 60)
             print(f"\n\n⏸  SYSTEM PAUSED at {m:02d}:{s:02d}")
             print("---------------------------------")
             choice = input("Option: (R)esume, (S)ave & Exit, (D)iscard: ").lower()
             
             if choice == 'r':
                 print("\n▶️ Resuming focus...")
+                engine.resume()
                 continue 
             elif choice == 's':
+                engine.finish()
+                task.actual_mins = engine.actual_seconds() / 60
+                task.segments = engine.clock.segments
                 task.notes = input("\nQuick note on partial progress: ")
                 save_results([task])
                 print("✅ Progress saved. Session ended.")
                 sys.exit()
             else:
+                _journal.end()
                 print("🚫 Session discarded. No data saved.")
                 sys.exit()
 
     # Trigger alarm once loop completes naturally
-    trigger_alarm_and_overtime(task)
+    trigger_alarm_and_overtime(task, engine)
 
-def trigger_alarm_and_overtime(task):
-    sound_high = "/System/Library/Sounds/Glass.aiff"
-    sound_low = "/System/Library/Sounds/Basso.aiff"
-    
-    print(f"\n\n{'!'*30}\n⏰ TIME IS UP: {task.name.upper()}\n{'!'*30}")
-    
-    # Start persistent alarm loop
-    alarm_process = subprocess.Popen(
-        ['/bin/bash', '-c', f'while true; do afplay -v 255 {sound_high} & afplay -v 255 {sound_low}; sleep 1; done']
-    )
-    input("\n👉 PRESS [ENTER] TO SILENCE ALARM...")
-    alarm_process.terminate()
-
-    finished = input(f"\nDid you finish '{task.name}'? (y/n): ").lower()
-    
-    if finished == 'y':
-        task.completed = True
+def trigger_alarm_and_overtime(task, engine):
+    if engine.state == ALARM:
+        print(f"\n\n{'!'*30}\n⏰ TIME IS UP: {task.name.upper()}\n{'!'*30}")
+
+        # Same in-process looping alarm as the GUI; it plays in the background
+        # while we wait for ENTER. Fall back to the terminal bell without audio;
+        # nothing else is waiting on us here, so give the preload time to finish.
+        if not play_alarm(wait=LOAD_TIMEOUT):
+            print("\a", end="", flush=True)
+        input("\n👉 PRESS [ENTER] TO SILENCE ALARM...")
+        stop_alarm()
+
+        finished = input(f"\nDid you finish '{task.name}'? (y/n): ").lower()
+        if finished == 'y':
+            task.completed = True
+        else:
+            print("\n🚀 ENTERING OVERTIME... (Press Ctrl+C when actually finished)")
+            engine.keep_going()
     else:
+        print("\n🚀 BACK IN OVERTIME... (Press Ctrl+C when actually finished)")
+
+    if engine.state == OVERTIME:
         # OVERTIME STOPWATCH
-        print("\n🚀 ENTERING OVERTIME... (Press Ctrl+C when actually finished)")
-        ot_start = time.time()
         try:
             while True:
-                elapsed = time.time() - ot_start
-                m, s = divmod(int(elapsed), 60)
+                m, s = divmod(engine.display_seconds(), 60)
                 print(f"⏱️ Overtime: {m:02d}:{s:02d}", end="\r")
-                time.sleep(1)
+                time.sleep(engine.ms_to_next_tick() / 1000)
+                _journal.checkpoint(engine.clock.elapsed())
         except KeyboardInterrupt:
-            ot_mins = (time.time() - ot_start) / 60
-            task.actual_mins += ot_mins
+            ot_mins = engine.overtime_seconds() / 60
             task.completed = True
             print(f"\n\n✅ Overtime ended. Added {round(ot_mins, 2)}m.")
 
+    engine.finish()
+    task.actual_mins = engine.actual_seconds() / 60
+    task.segments = engine.clock.segments
     task.notes = input("\nFinal reflection/note: ")
 
 def save_results(tasks):
-    file_path = 'work_log.csv'
-    file_exists = os.path.isfile(file_path)
-    
-    with open(file_path, 'a', newline='') as file:
-        writer = csv.writer(file)
-        if not file_exists:
-            writer.writerow(["Date", "Category", "Task", "Est_Mins", "Actual_Mins", "Completed", "Notes"])
-        
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        for t in tasks:
-            writer.writerow([
-                timestamp, 
-                t.category, 
-                t.name, 
-                t.estimated_mins, 
-                round(t.actual_mins, 2), 
-                t.completed, 
-                t.notes
-            ])
+    # Same log, format and store as the GUI
+    writer = get_writer()
+    ended_at = datetime.now()
+    timestamp = ended_at.strftime("%Y-%m-%d %H:%M:%S")
+    for t in tasks:
+        started_at = datetime.fromtimestamp(t.segments[0][0]) if t.segments else None
+        writer.write(session_row(ended_at, started_at, t.category, t.name, t.estimated_mins,
+                                 round(t.actual_mins, 2), t.completed, t.notes, None, "cli"))
+    writer.flush()
+    _journal.end()
+    save_segments(timestamp, tasks)
     print(f"\n📊 DATA LOGGED. Total time for this session: {round(tasks[0].actual_mins, 2)}m.")
 
+def save_segments(timestamp, tasks):
+    # One row per start..pause stretch, keyed to the summary row by End + Task
+    # (one locked append, like the session log, so concurrent CLIs don't interleave)
+    file_path = 'work_log_segments.csv'
+    fmt = lambda ts: datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+    
+    header, rows = io.StringIO(), io.StringIO()
+    csv.writer(header).writerow(["Date", "Task", "Segment", "Start", "End", "Seconds"])
+    writer = csv.writer(rows)
+    for t in tasks:
+        for i, (start, end, seconds) in enumerate(t.segments, 1):
+            writer.writerow([timestamp, t.name, i, fmt(start), fmt(end), round(seconds, 3)])
+    with open(file_path, 'a+b') as file:
+        append_locked(file, rows.getvalue().encode("utf-8"), header.getvalue().encode("utf-8"))
+
+def resume_orphan():
+    # A journal left behind means the last session never got saved
+    orphan = recover()
+    if orphan is None:
+        return False
+    m, s = divmod(int(orphan["elapsed"]), 60)
+    print(f"\n⚠️ Unfinished session found: [{orphan['category']}] {orphan['task']} ({m:02d}:{s:02d} recorded)")
+    choice = input("Option: (R)esume, (S)ave as is, (D)iscard: ").lower()
+    if choice not in ("r", "s"):
+        discard_journal()
+        print("🚫 Unfinished session discarded.")
+        return False
+
+    task = Task(orphan["task"], orphan["category"], orphan["est_mins"])
+    engine = TimerEngine()
+    _journal.begin(task.category, task.name, task.estimated_mins, elapsed=orphan["elapsed"],
+                   started_at=orphan["started_at"])
+    # The time run before the interruption becomes the session's first segment
+    engine.restore(task.estimated_mins, orphan["elapsed"], orphan["overtime"],
+                   [[orphan["started_at"], orphan["last_wall"], orphan["elapsed"]]])
+    if choice == "r":
+        input("👉 Press [ENTER] to pick up where you left off...")
+        run_timer(task, engine)
+    else:
+        engine.finish()
+        task.actual_mins = engine.actual_seconds() / 60
+        task.completed = orphan["overtime"] or orphan["state"] in ("alarm", "review")
+        task.segments = engine.clock.segments
+        task.notes = "Recovered after an interrupted session"
+    save_results([task])
+    return True
+
 def main():
     try:
+        if resume_orphan():
+            print("\n✨ Session Complete. Go take a real break!")
+            return
         current_task = get_single_task()
         run_timer(current_task)
         save_results([current_task])
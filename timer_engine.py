@@ -0,0 +1,146 @@
+import math
+from collections import defaultdict
+from ticker import MonotonicClock
+
+IDLE = "idle"
+RUNNING = "running"
+PAUSED = "paused"
+ALARM = "alarm"
+OVERTIME = "overtime"
+REVIEW = "review"
+
+class TimerEngine:
+    # UI-independent countdown -> alarm -> overtime -> review state machine.
+    # Front ends call the transition methods and render from the events:
+    #   "state" (old, new)   every state change
+    #   "alarm" ()           the countdown reached zero
+    #   "tick"  (seconds)    the displayed value changed: remaining seconds during
+    #                        the countdown, overtime seconds after keep_going()
+    # Time comes from a MonotonicClock; pass one with a fake time_fn to run
+    # sessions at accelerated time.
+
+    def __init__(self, clock=None):
+        self.clock = clock or MonotonicClock()
+        self.state = IDLE
+        self.total_seconds = 0
+        self._overtime = False
+        self._paused_from = None
+        self._shown = None
+        self._listeners = defaultdict(list)
+
+    def on(self, event, callback):
+        self._listeners[event].append(callback)
+        return callback
+
+    def _emit(self, event, *args):
+        for callback in self._listeners[event]:
+            callback(*args)
+
+    def _set_state(self, new):
+        old, self.state = self.state, new
+        if old != new:
+            self._emit("state", old, new)
+
+    # --- QUERIES ---
+    @property
+    def running(self):
+        return self.state in (RUNNING, OVERTIME)
+
+    @property
+    def phase(self):
+        return "overtime" if self._overtime else "countdown"
+
+    def remaining_seconds(self):
+        return max(0, math.ceil(self.total_seconds - self.clock.elapsed()))
+
+    def overtime_seconds(self):
+        if not self._overtime:
+            return 0.0
+        return max(0.0, self.clock.elapsed() - self.total_seconds)
+
+    def actual_seconds(self):
+        # Running time only: pauses and the alarm screen are not counted
+        elapsed = self.clock.elapsed()
+        return elapsed if self._overtime else min(elapsed, self.total_seconds)
+
+    def display_seconds(self):
+        return int(self.overtime_seconds()) if self._overtime else self.remaining_seconds()
+
+    def ms_to_next_tick(self):
+        return self.clock.ms_to_next_second()
+
+    # --- TRANSITIONS ---
+    def start(self, minutes):
+        if self.state != IDLE:
+            return
+        self.total_seconds = int(round(minutes * 60))
+        self.clock.start()
+        self._set_state(RUNNING)
+        self.tick()
+
+    def restore(self, minutes, elapsed, overtime=False, segments=None):
+        # Picks up a session that ran elsewhere (recovered from the journal):
+        # PAUSED with its running time banked, so resume() carries on from there
+        if self.state != IDLE:
+            return
+        self.total_seconds = int(round(minutes * 60))
+        self.clock.restore(elapsed, segments)
+        self._overtime = overtime
+        self._paused_from = OVERTIME if overtime else RUNNING
+        self._set_state(PAUSED)
+        self.tick()
+
+    def pause(self):
+        if not self.running:
+            return
+        self.clock.pause()
+        self._paused_from = self.state
+        self._set_state(PAUSED)
+
+    def resume(self):
+        if self.state != PAUSED:
+            return
+        self.clock.start()
+        self._set_state(self._paused_from)
+        self.tick()
+
+    def toggle_pause(self):
+        if self.running:
+            self.pause()
+        else:
+            self.resume()
+
+    def keep_going(self):
+        # Silence the alarm and keep counting as overtime
+        if self.state != ALARM:
+            return
+        self._overtime = True
+        self.clock.start()
+        self._set_state(OVERTIME)
+        self.tick()
+
+    def finish(self):
+        if self.state in (IDLE, REVIEW):
+            return
+        self.clock.pause()
+        self._set_state(REVIEW)
+
+    def reset(self):
+        self.clock.reset()
+        self.total_seconds = 0
+        self._overtime = False
+        self._paused_from = None
+        self._shown = None
+        self._set_state(IDLE)
+
+    def tick(self):
+        # Advance the state machine to "now" and emit the display value if it changed
+        if self.state == RUNNING and self.clock.elapsed() >= self.total_seconds:
+            self.clock.pause()
+            self._set_state(ALARM)
+            self._emit("alarm")
+        shown = (self.phase, self.display_seconds())
+        if shown != self._shown:
+            self._shown = shown
+            self._emit("tick", shown[1])
+        return shown[1]